@@ -0,0 +1,84 @@
+"""
+Benchmarks the evaluation of selectors on a large synthetic notebook.
+
+Usage:
+    python benchmarks/bench_selectors.py --cells 100000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import Callable
+
+from nbmanips import Notebook
+from nbmanips.selector import Selector, SelectorBase
+
+
+def make_notebook(n_cells: int) -> Notebook:
+    cells = []
+    for i in range(n_cells):
+        if i % 3 == 0:
+            cells.append(
+                {
+                    "cell_type": "markdown",
+                    "metadata": {"tags": ["train"] if i % 10 == 0 else []},
+                    "source": f"## Part {i}\nSome text about part {i}",
+                }
+            )
+        else:
+            cells.append(
+                {
+                    "cell_type": "code",
+                    "execution_count": i,
+                    "metadata": {},
+                    "source": f"x_{i} = fit({i})\nprint(x_{i})",
+                    "outputs": [
+                        {"output_type": "stream", "name": "stdout", "text": f"{i}\n"}
+                    ],
+                }
+            )
+
+    content = {"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 4}
+    return Notebook(content, validate=False, copy=False)
+
+
+SCENARIOS: dict[str, Callable[[], SelectorBase]] = {
+    "index": lambda: Selector(-3),
+    "slice": lambda: Selector(slice(100, -100, 3)),
+    "is_code": lambda: Selector("is_code"),
+    "and": lambda: Selector("is_code") & Selector("contains", "fit"),
+    "or": lambda: Selector("is_markdown") | Selector("has_tag", "train"),
+    "nested": lambda: (
+        Selector(slice(10, None))
+        & (Selector("is_code") | Selector("has_tag", "train"))
+        & ~(Selector("contains", "x_1") | Selector("is_raw"))
+    ),
+    "last": lambda: Selector("is_markdown"),
+}
+
+
+def run(nb: Notebook, repeat: int) -> None:
+    for name, get_selector in SCENARIOS.items():
+        selector = get_selector()
+
+        def method(name=name, selector=selector):
+            # a new selection each time, so that the cached results are not reused
+            selection = nb.select(selector)
+            return selection.last() if name == "last" else selection.count()
+
+        duration = min(timeit.repeat(method, number=1, repeat=repeat))
+        print(f"{name:<10} {duration * 1000:10.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cells", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    run(make_notebook(args.cells), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import click
 from nbmanips import __version__
 from nbmanips.cli import collection, explore, transform
 from nbmanips.cli.convert import convert
+from nbmanips.cli.index import index
 from nbmanips.cli.select import select
 
 __all__ = ["nbmanips"]
@@ -24,6 +25,7 @@ def _add_commands(module: ModuleType) -> None:
 
 nbmanips.add_command(convert)
 nbmanips.add_command(select)
+nbmanips.add_command(index)
 _add_commands(explore)
 _add_commands(transform)
 _add_commands(collection)
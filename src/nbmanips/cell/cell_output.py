@@ -29,6 +29,19 @@ class CellOutput:
     def to_html(self, excluded_data_types=None):
         return ""
 
+    @property
+    def raw_text(self) -> str:
+        """
+        Textual content of the output, read from the raw output without any parser
+        """
+        return ""
+
+    def is_empty(self) -> bool:
+        """
+        Checks, without rendering the output, whether it would be rendered empty
+        """
+        return not self.raw_text.strip()
+
     def erase_output(self, output_types: set):
         raise NotImplementedError()
 
@@ -110,6 +123,13 @@ class StreamOutput(CellOutput, output_type="stream"):
             return parser.parse(output_text, **parser_config)
         return output_text
 
+    @property
+    def raw_text(self) -> str:
+        output_text = self.text
+        if not isinstance(output_text, str):
+            output_text = "\n".join(output_text)
+        return output_text
+
     def to_html(self, excluded_data_types=None):
         excluded_data_types = (
             set() if excluded_data_types is None else set(excluded_data_types)
@@ -201,6 +221,32 @@ class DataOutput(CellOutput):
 
         return ""
 
+    @property
+    def raw_text(self) -> str:
+        data = self.content["data"]
+        text_types = sorted(key for key in data if key.startswith("text/"))
+        if "text/plain" in data:
+            text_types.insert(0, "text/plain")
+
+        for data_type in text_types:
+            output_text = data[data_type]
+            if not isinstance(output_text, str):
+                output_text = "\n".join(output_text)
+            return output_text
+        return ""
+
+    def is_empty(self) -> bool:
+        for data_type, value in self.content["data"].items():
+            if not data_type.startswith("text/"):
+                if value:
+                    return False
+                continue
+
+            text = value if isinstance(value, str) else "\n".join(value)
+            if text.strip():
+                return False
+        return True
+
     def erase_output(self, output_types: set):
         for key in output_types:
             self.content["data"].pop(key, None)
@@ -277,6 +323,10 @@ class ErrorOutput(CellOutput, output_type="error"):
 
         return _to_html("\n".join([*self.traceback, f"{self.ename}: {self.evalue}"]))
 
+    @property
+    def raw_text(self) -> str:
+        return "\n".join([*self.traceback, f"{self.ename}: {self.evalue}"])
+
     def erase_output(self, output_types: set):
         return None if self.has_output_type(output_types) else self.content
 
@@ -21,20 +21,30 @@ from nbmanips.cell.cell_utils import (
     printable_cell,
     total_size,
 )
+from nbmanips.cell.symbols import Symbols, get_symbols
 
 
 class Cell:
     _cell_types: ClassVar[dict[str, type[Cell]]] = {}
 
-    def __init__(self, content, num=None):
+    def __init__(self, content, num=None, revision=None):
         self.cell = content
         self._num = num
+        self._revision = revision
 
     def __getitem__(self, key):
         return self.cell[key]
 
     def __setitem__(self, key, value):
         self.cell[key] = value
+        self._touch()
+
+    def _touch(self):
+        """
+        Notifies the notebook (if any) that the cell was modified
+        """
+        if self._revision is not None:
+            self._revision.bump()
 
     @property
     def type(self):
@@ -46,7 +56,7 @@ class Cell:
 
     @id.setter
     def id(self, new_id):
-        self.cell["id"] = new_id
+        self["id"] = new_id
 
     @property
     def num(self):
@@ -56,9 +66,18 @@ class Cell:
     def metadata(self):
         return self.cell["metadata"]
 
+    def _get_text(self, name: str, field: str, compute) -> str:
+        """
+        Returns a text computed from a field of the cell,
+        cached until the notebook is modified
+        """
+        if self._revision is None:
+            return compute()
+        return self._revision.get_text(name, self.cell.get(field), compute)
+
     @property
     def source(self):
-        return self.get_source().strip()
+        return self._get_text("source", "source", lambda: self.get_source().strip())
 
     @source.setter
     def source(self, source: str):
@@ -66,12 +85,33 @@ class Cell:
 
     @property
     def output(self):
-        return self.get_output(text=True).strip()
+        return self._get_text(
+            "output", "outputs", lambda: self.get_output(text=True).strip()
+        )
 
     @property
     def outputs(self):
         return map(CellOutput, self.cell.get("outputs", []))
 
+    @property
+    def raw_output(self):
+        """
+        Textual content of the outputs, without rendering them (e.g. images are skipped)
+        """
+        return self._get_text(
+            "raw_output",
+            "outputs",
+            lambda: "\n".join(output.raw_text for output in self.outputs).strip(),
+        )
+
+    def has_output(self):
+        """
+        Checks if the cell has any output, without rendering the outputs
+
+        :return: a bool object (True if the cell has a non-empty output)
+        """
+        return not all(output.is_empty() for output in self.outputs)
+
     def get_copy(self, new_id=None):
         from copy import deepcopy
 
@@ -124,19 +164,25 @@ class Cell:
             content = [
                 f"{line}\n" if i != len(lines) else line for i, line in enumerate(lines)
             ]
-        self.cell["source"] = content
+        self["source"] = content
+
+    def _get_search_target(self, output: bool | str = False):
+        search_target = self.source
+        if output == "raw":
+            search_target += "\n" + self.raw_output
+        elif output:
+            search_target += "\n" + self.output
+        return search_target
 
     def contains(
         self,
         text: str,
         case: bool = True,
-        output: bool = False,
+        output: bool | str = False,
         regex: bool = False,
         flags: int = 0,
     ):
-        search_target = self.source
-        if output:
-            search_target += "\n" + self.output
+        search_target = self._get_search_target(output)
 
         if not regex:
             if not case:
@@ -149,9 +195,7 @@ class Cell:
         return bool(re.search(text, search_target, flags=flags))
 
     def has_match(self, regex, output=False):
-        search_target = self.source
-        if output:
-            search_target += "\n" + self.output
+        search_target = self._get_search_target(output)
 
         return bool(regex.search(search_target))
 
@@ -235,6 +279,7 @@ class Cell:
             self.metadata[key].update(value)
         else:
             self.metadata[key] = value
+        self._touch()
 
     def add_tag(self, tag: str):
         """
@@ -251,6 +296,7 @@ class Cell:
             return
 
         self.metadata["tags"].append(tag)
+        self._touch()
 
     def remove_tag(self, tag: str):
         """
@@ -263,6 +309,7 @@ class Cell:
 
         while tag in self.metadata["tags"]:
             self.metadata["tags"].remove(tag)
+        self._touch()
 
     @staticmethod
     def generate_id_candidate():
@@ -284,6 +331,13 @@ class Cell:
 
 
 class CodeCell(Cell, cell_type="code"):
+    @property
+    def symbols(self) -> Symbols:
+        """
+        Identifiers, calls, imports and definitions of the code of the cell
+        """
+        return self._get_text("symbols", "source", lambda: get_symbols(self.source))
+
     def to_str(
         self,
         width=None,
@@ -360,6 +414,7 @@ class MarkdownCell(Cell, cell_type="markdown"):
         self.attachments[attachment_name] = {
             mime_type: base64.encodebytes(path.read_bytes()).decode("utf-8")
         }
+        self._touch()
 
     @property
     def html(self):
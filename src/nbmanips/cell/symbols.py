@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import ast
+import io
+import keyword
+import re
+import tokenize
+from typing import NamedTuple
+
+# lines running IPython magics or shell commands (`%time f()`, `x = !ls`)
+_MAGIC_LINE = re.compile(r"^(?P<indent>\s*)(?:[\w.,\s]+=\s*)?[%!]")
+# parts of a line changing the bracket depth: strings, comments and brackets
+_TRIPLE_QUOTES = ("'''", '"""')
+_LINE_TOKEN = re.compile(r"'''|\"\"\"|'|\"|#|[()[\]{}]")
+_STRING_ENDS = {
+    quote: re.compile(r"(?:\\.|[^\\])*?" + quote, re.DOTALL)
+    for quote in (*_TRIPLE_QUOTES, "'", '"')
+}
+
+
+class Symbols(NamedTuple):
+    """
+    Symbol table of the Python code of a cell.
+    Comments and strings are not part of it.
+    """
+
+    identifiers: frozenset[str]
+    calls: frozenset[str]
+    imports: frozenset[str]
+    defines: frozenset[str]
+
+
+def get_symbols(source: str) -> Symbols:
+    """
+    Tokenizes and parses the source of a code cell, skipping the IPython magics.
+    If the code cannot be parsed, only the identifiers are extracted.
+
+    :param source: Python code
+    :return: the symbol table of the code
+    """
+    if source.lstrip().startswith("%%"):
+        # cell magics are not Python code
+        return Symbols(frozenset(), frozenset(), frozenset(), frozenset())
+
+    code = _comment_magics(source)
+    identifiers = _get_identifiers(code)
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return Symbols(identifiers, frozenset(), frozenset(), frozenset())
+
+    calls, imports, defines = set(), set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            calls.update(_get_call_names(node.func))
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.update(_get_prefixes(alias.name))
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                imports.add("." * node.level + (node.module or ""))
+                continue
+            imports.update(_get_prefixes(node.module))
+            imports.update(
+                f"{node.module}.{alias.name}"
+                for alias in node.names
+                if alias.name != "*"
+            )
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            defines.add(node.name)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            defines.add(node.id)
+
+    return Symbols(
+        identifiers, frozenset(calls), frozenset(imports), frozenset(defines)
+    )
+
+
+def _comment_magics(source: str) -> str:
+    """
+    Replaces the magic lines by `pass` statements. Only the lines starting a new
+    statement can be magics: `% x` continuing an expression is a modulo.
+    """
+    lines = []
+    depth, quote, continued = 0, None, False
+    for line in source.splitlines():
+        if not depth and quote is None and not continued:
+            magic_line = _MAGIC_LINE.sub(r"\g<indent>pass  # ", line, count=1)
+            if magic_line != line:
+                lines.append(magic_line)
+                continue
+        depth, quote, continued = _scan_line(line, depth, quote)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _scan_line(
+    line: str, depth: int, quote: str | None
+) -> tuple[int, str | None, bool]:
+    """
+    :return: the bracket depth and the open triple-quoted string at the end of the
+     line, and whether it is continued by a backslash
+    """
+    position = 0
+    while True:
+        if quote is not None:
+            end = _STRING_ENDS[quote].match(line, position)
+            if end is None:
+                # only the triple-quoted strings span several lines
+                return depth, quote if quote in _TRIPLE_QUOTES else None, False
+            quote, position = None, end.end()
+
+        token = _LINE_TOKEN.search(line, position)
+        if token is None:
+            return depth, None, line.endswith("\\")
+        if token.group() == "#":
+            return depth, None, False
+
+        position = token.end()
+        if token.group() in "([{":
+            depth += 1
+        elif token.group() in ")]}":
+            depth = max(depth - 1, 0)
+        else:
+            quote = token.group()
+
+
+def _get_identifiers(code: str) -> frozenset[str]:
+    identifiers = set()
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type == tokenize.NAME and not keyword.iskeyword(token.string):
+                identifiers.add(token.string)
+    except (tokenize.TokenError, SyntaxError):
+        # the identifiers found before the error are kept
+        pass
+    return frozenset(identifiers)
+
+
+def _get_call_names(func: ast.expr) -> list[str]:
+    """
+    `model.fit(...)` is a call to both `fit` and `model.fit`
+    """
+    parts = []
+    while isinstance(func, ast.Attribute):
+        parts.append(func.attr)
+        func = func.value
+    if isinstance(func, ast.Name):
+        parts.append(func.id)
+        return [parts[0], ".".join(reversed(parts))]
+    return parts[:1]
+
+
+def _get_prefixes(module: str) -> list[str]:
+    """
+    `import a.b.c` imports `a`, `a.b` and `a.b.c`
+    """
+    parts = module.split(".")
+    return [".".join(parts[: i + 1]) for i in range(len(parts))]
@@ -1,11 +1,36 @@
 from pathlib import Path
 
 import click
-import cloudpickle
+
+STDIO_PATH = "-"
+
+_SELECTOR_FILE_KEY = "nbmanips.selector_file"
+_STDIN_CONSUMED_KEY = "nbmanips.stdin_consumed"
+_QUERY_KEY = "nbmanips.query"
+
+
+def read_notebook(notebook_path):
+    from nbmanips import Notebook
+
+    if notebook_path != STDIO_PATH:
+        return Notebook.read(notebook_path)
+
+    ctx = click.get_current_context(silent=True)
+    if ctx is not None:
+        ctx.meta[_STDIN_CONSUMED_KEY] = True
+
+    return Notebook.from_json(click.get_text_stream("stdin").read())
 
 
 def export(nb, input_path, output_path, force=False):
     default_output = output_path is None
+    if default_output and input_path == STDIO_PATH:
+        output_path = STDIO_PATH
+
+    if output_path == STDIO_PATH:
+        click.echo(nb.to_json())
+        return
+
     output_path = input_path if output_path is None else output_path
     if not force and Path(output_path).exists():
         click.echo(
@@ -27,13 +52,74 @@ def export(nb, input_path, output_path, force=False):
     nb.to_ipynb(output_path)
 
 
+def _store_selector_file(ctx, param, value):
+    if value is not None:
+        ctx.meta[_SELECTOR_FILE_KEY] = value
+    return value
+
+
+def _store_query(ctx, param, value):
+    if value is not None:
+        from nbmanips.selector.query import parse_query
+
+        try:
+            ctx.meta[_QUERY_KEY] = parse_query(value)
+        except ValueError as e:
+            raise click.BadParameter(str(e), ctx=ctx, param=param) from None
+    return value
+
+
+def selector_option(func):
+    func = click.option(
+        "--query",
+        "-q",
+        default=None,
+        expose_value=False,
+        callback=_store_query,
+        help="Selector expression, e.g. \"is_code & ~has_output_type('image/png')\"",
+    )(func)
+    return click.option(
+        "--selector-file",
+        "-S",
+        type=click.File("rb"),
+        default=None,
+        expose_value=False,
+        callback=_store_selector_file,
+        help="Read the selector from this file instead of the standard input",
+    )(func)
+
+
 def get_selector():
-    binary_stream = click.get_binary_stream("stdin")
-    if binary_stream.isatty():
+    ctx = click.get_current_context(silent=True)
+    meta = {} if ctx is None else ctx.meta
+
+    selector = _read_selector(meta)
+    query = meta.get(_QUERY_KEY)
+    if query is None:
+        return selector
+    return query if selector is None else selector & query
+
+
+def _read_selector(meta):
+    if _SELECTOR_FILE_KEY in meta:
+        binary_stream = meta[_SELECTOR_FILE_KEY]
+    elif meta.get(_STDIN_CONSUMED_KEY):
         return None
+    else:
+        binary_stream = click.get_binary_stream("stdin")
+        if binary_stream.isatty():
+            return None
 
     stream = binary_stream.read()
-    if not stream:
+    if not stream.strip():
         return None
 
+    if stream.lstrip().startswith(b"{"):
+        from nbmanips.selector.serialization import from_json
+
+        return from_json(stream)
+
+    # selectors saved by older versions
+    import cloudpickle
+
     return cloudpickle.loads(stream)
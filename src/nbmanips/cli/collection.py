@@ -4,7 +4,7 @@ from operator import add
 import click
 
 from nbmanips import Notebook
-from nbmanips.cli import export, get_selector
+from nbmanips.cli import export, get_selector, selector_option
 
 __all__ = [
     "cat",
@@ -28,6 +28,7 @@ __all__ = [
     default=None,
     help="Notebook to apply selector on. if unused, selector will be applied to all notebooks",
 )
+@selector_option
 def cat(file, select, output, force):
     nbs = [Notebook.read(notebook_path) for notebook_path in file]
     selector = get_selector()
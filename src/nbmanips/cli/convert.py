@@ -3,7 +3,7 @@ import os
 import click
 
 from nbmanips import Notebook
-from nbmanips.cli import get_selector
+from nbmanips.cli import get_selector, selector_option
 
 __all__ = ["convert"]
 
@@ -62,6 +62,7 @@ def convert():
     help="any additional parameters",
     type=(str, str),
 )
+@selector_option
 def html(
     notebook_path,
     output,
@@ -141,6 +142,7 @@ def html(
     help="any additional parameters",
     type=(str, str),
 )
+@selector_option
 def md(
     notebook_path,
     output,
@@ -184,6 +186,7 @@ def md(
     help="any additional parameters",
     type=(str, str),
 )
+@selector_option
 def py(notebook_path, output, template_name, kwargs):
     if output is None:
         output = os.path.splitext(notebook_path)[0] + ".py"
@@ -252,6 +255,7 @@ def py(notebook_path, output, template_name, kwargs):
     help="any additional parameters",
     type=(str, str),
 )
+@selector_option
 def slides(
     notebook_path,
     output,
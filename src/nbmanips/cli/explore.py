@@ -1,13 +1,16 @@
+from contextlib import closing
+from pathlib import Path
+
 import click
 import colorama
 
 from nbmanips import Notebook
 from nbmanips.cell.cell_utils import styles
-from nbmanips.cli import get_selector
+from nbmanips.cli import get_selector, selector_option
 
 _COLORS = list(set(vars(colorama.Fore)) - {"RESET"})
 
-__all__ = ["show", "count", "first", "last", "list_", "search", "toc"]
+__all__ = ["show", "count", "first", "last", "list_", "search", "grep", "toc"]
 
 
 @click.command(help="show notebook in human readable format")
@@ -32,6 +35,13 @@ __all__ = ["show", "count", "first", "last", "list_", "search", "toc"]
 @click.option("--image-color/--no-image-color", "-ic/-nic", type=bool, default=None)
 @click.option("--parser", "-p", "parsers", type=str, multiple=True)
 @click.option("--truncate", "-t", type=int, default=None)
+@click.option(
+    "--pager/--no-pager",
+    type=bool,
+    default=False,
+    help="Display the notebook through the pager ($PAGER)",
+)
+@selector_option
 def show(
     notebook_path,
     width,
@@ -44,16 +54,19 @@ def show(
     image_color,
     excluded_data_types,
     truncate,
+    pager,
 ):
-    nb = Notebook.read(notebook_path)
+    # only the selected cells are parsed
     selector = get_selector()
+    fields = None if output else ("source", "attachments", "metadata")
+    nb = Notebook.read(notebook_path, select=selector, fields=fields)
 
     parsers_config = None
     if image_width or image_color:
         parsers_config = {"image": {"width": image_width, "colorful": image_color}}
 
     # image_color, image_width
-    nb.select(selector).show(
+    nb.show(
         width,
         exclude_output=not output,
         use_pygments=pygments,
@@ -63,24 +76,26 @@ def show(
         parsers_config=parsers_config,
         excluded_data_types=excluded_data_types or None,
         truncate=truncate,
+        pager=pager,
     )
 
 
 @click.command(help="count selected cells")
 @click.argument("notebook_path")
+@selector_option
 def count(notebook_path):
-    nb = Notebook.read(notebook_path)
-    selector = get_selector()
+    nb = Notebook.read(notebook_path, select=get_selector(), fields=())
 
-    result = nb.select(selector).count()
+    result = nb.count()
     click.echo(result)
 
 
 @click.command(help="Return the number of the first selected cell")
 @click.argument("notebook_path")
+@selector_option
 def first(notebook_path):
-    nb = Notebook.read(notebook_path)
     selector = get_selector()
+    nb = Notebook.read(notebook_path, fields=_get_fields(selector))
 
     result = nb.select(selector).first()
     click.echo(result)
@@ -88,9 +103,10 @@ def first(notebook_path):
 
 @click.command(help="Return the number of the last selected cell")
 @click.argument("notebook_path")
+@selector_option
 def last(notebook_path):
-    nb = Notebook.read(notebook_path)
     selector = get_selector()
+    nb = Notebook.read(notebook_path, fields=_get_fields(selector))
 
     result = nb.select(selector).last()
     click.echo(result)
@@ -98,35 +114,235 @@ def last(notebook_path):
 
 @click.command(help="Return the numbers of the selected cells")
 @click.argument("notebook_path")
+@selector_option
 def list_(notebook_path):
-    nb = Notebook.read(notebook_path)
     selector = get_selector()
+    nb = Notebook.read(notebook_path, fields=_get_fields(selector))
 
     result = nb.select(selector).list()
     click.echo(result)
 
 
+_CODE_SELECTORS = {
+    "identifier": "has_identifier",
+    "call": "calls",
+    "import": "imports",
+    "definition": "defines",
+}
+
+
 @click.command(help="Search string in all selected cells")
 @click.argument("notebook_path")
-@click.option("--text", "-t", required=True)
+@click.option("--text", "-t", default=None)
+@click.option(
+    "--patterns-file",
+    "-f",
+    type=click.File("r"),
+    default=None,
+    help="Search all the patterns of this file (one per line) in a single pass",
+)
 @click.option("--case/--no-case", default=False)
 @click.option("--regex", "-r", is_flag=True, default=False)
 @click.option("--output", "-o", is_flag=True, default=False)
-def search(notebook_path, text, case, output, regex):
+@click.option(
+    "--index",
+    "-x",
+    "use_index",
+    is_flag=True,
+    default=False,
+    help="Search the words of TEXT in the index of the directory NOTEBOOK_PATH"
+    " (see `nb index build`)",
+)
+@click.option("--index-file", type=click.Path(dir_okay=False), default=None)
+@click.option("--limit", "-n", type=int, default=None, help="Maximum number of hits")
+@click.option(
+    "--code",
+    "-c",
+    type=click.Choice(list(_CODE_SELECTORS)),
+    is_flag=False,
+    flag_value="identifier",
+    default=None,
+    help="Search TEXT as a name in the Python code, ignoring comments and strings"
+    " (default: identifier)",
+)
+@selector_option
+def search(
+    notebook_path,
+    text,
+    patterns_file,
+    case,
+    output,
+    regex,
+    use_index,
+    index_file,
+    limit,
+    code,
+):
+    if (text is None) == (patterns_file is None):
+        raise click.UsageError("Provide either --text or --patterns-file")
+
+    if use_index:
+        if text is None:
+            raise click.UsageError("--index does not support --patterns-file")
+        unsupported = [
+            option
+            for option, value in (
+                ("--case", case),
+                ("--regex", regex),
+                ("--code", code is not None),
+                ("selectors", get_selector() is not None),
+            )
+            if value
+        ]
+        if unsupported:
+            raise click.UsageError(f"--index does not support {', '.join(unsupported)}")
+        _search_index(notebook_path, text, output, index_file, limit)
+        return
+
     nb = Notebook.read(notebook_path)
-    selector = get_selector()
+    selection = nb.select(get_selector())
 
-    result = nb.select(selector).search_all(text, case, output, regex)
-    click.echo(result)
+    if patterns_file is None:
+        if code is None:
+            result = selection.search_all(text, case, output, regex)
+        else:
+            result = selection.select(_CODE_SELECTORS[code], text).list()
+        click.echo(result)
+        return
+
+    patterns = [line.rstrip("\r\n") for line in patterns_file]
+    patterns = [pattern for pattern in patterns if pattern]
+    if code is None:
+        results = selection.search_many(patterns, case, output, regex)
+    else:
+        # the code of the cells is parsed once for all the patterns
+        results = {
+            pattern: selection.select(_CODE_SELECTORS[code], pattern).list()
+            for pattern in patterns
+        }
+    for pattern, cells in results.items():
+        if cells:
+            click.echo(f"{pattern}: {cells}")
+
+
+def _search_index(directory, text, output, index_file, limit):
+    from nbmanips.index import DEFAULT_INDEX_NAME, NotebookIndex
+
+    root = Path(directory)
+    index_path = Path(index_file or root / DEFAULT_INDEX_NAME)
+    if not index_path.exists():
+        raise click.UsageError(f"No index found: run `nb index build {directory}`")
+
+    with closing(NotebookIndex(root, index_path)) as nb_index:
+        for hit in nb_index.search(text, output=output, limit=limit):
+            click.echo(f"{root / hit.path}:{hit.cell}")
+
+
+@click.command(
+    help="Search PATTERN in the lines of the cells of the notebooks in PATHS"
+    " (files, directories or glob patterns)"
+)
+@click.argument("pattern")
+@click.argument("paths", nargs=-1, required=True)
+@click.option("--recursive", "-r", is_flag=True, default=False)
+@click.option("--regex", "-E", is_flag=True, default=False)
+@click.option("--ignore-case", "-i", is_flag=True, default=False)
+@click.option(
+    "--files-with-matches",
+    "-l",
+    is_flag=True,
+    default=False,
+    help="Only print the paths of the matching notebooks",
+)
+@click.option(
+    "--count",
+    "-c",
+    "count_",
+    is_flag=True,
+    default=False,
+    help="Only print the number of matching lines of each notebook",
+)
+@click.option(
+    "--max-count",
+    "-m",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Stop searching a notebook after NUM matching lines",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of notebooks to search concurrently",
+)
+def grep(
+    pattern,
+    paths,
+    recursive,
+    regex,
+    ignore_case,
+    files_with_matches,
+    count_,
+    max_count,
+    jobs,
+):
+    from nbmanips.grep import grep as grep_notebooks
+
+    if files_with_matches and count_:
+        raise click.UsageError("--files-with-matches and --count are exclusive")
+
+    results = grep_notebooks(
+        pattern,
+        paths,
+        recursive=recursive,
+        regex=regex,
+        case=not ignore_case,
+        max_count=1 if files_with_matches else max_count,
+        jobs=jobs,
+    )
+    matched = failed = False
+    for result in results:
+        if result.error is not None:
+            click.echo(f"nb grep: {result.path}: {result.error}", err=True)
+            failed = True
+            continue
+
+        matched = matched or bool(result.hits)
+        if count_:
+            click.echo(f"{result.path}:{len(result.hits)}")
+        elif files_with_matches:
+            if result.hits:
+                click.echo(result.path)
+        else:
+            for hit in result.hits:
+                click.echo(str(hit))
+
+    # same exit status as grep
+    if failed:
+        raise SystemExit(2)
+    if not matched:
+        raise SystemExit(1)
 
 
 @click.command(help="Return the numbers of the selected cells")
 @click.argument("notebook_path")
 @click.option("--width", "-w", type=int, required=False, default=None)
 @click.option("--index/--no-index", "-i/-ni", is_flag=True, default=True)
+@selector_option
 def toc(notebook_path, width, index):
     nb = Notebook.read(notebook_path)
     selector = get_selector()
 
     result = nb.select(selector).ptoc(width, index=index)
     click.echo(result)
+
+
+def _get_fields(selector):
+    # the cell numbers are needed: the selector is evaluated after reading the cells.
+    # The structural selectors only read the cell types and metadata
+    if selector is None:
+        return ()
+    if selector.structural:
+        return ("metadata",)
+    return None
@@ -0,0 +1,47 @@
+from contextlib import closing
+
+import click
+
+__all__ = ["index"]
+
+_index_file_option = click.option(
+    "--index-file",
+    "-f",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Path of the index (default: DIRECTORY/.nbindex.sqlite)",
+)
+
+
+@click.group(help="Full-text index of the notebooks of a directory")
+def index():
+    pass
+
+
+@index.command(help="Index all the notebooks of DIRECTORY")
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@_index_file_option
+def build(directory, index_file):
+    from nbmanips.index import NotebookIndex
+
+    with closing(NotebookIndex(directory, index_file)) as nb_index:
+        _echo_result(nb_index.build())
+
+
+@index.command(help="Reindex the notebooks of DIRECTORY modified since the last update")
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@_index_file_option
+def update(directory, index_file):
+    from nbmanips.index import NotebookIndex
+
+    with closing(NotebookIndex(directory, index_file)) as nb_index:
+        _echo_result(nb_index.update())
+
+
+def _echo_result(result):
+    click.echo(
+        f"{result.indexed} indexed, {result.unchanged} unchanged, "
+        f"{result.removed} removed, {len(result.skipped)} skipped"
+    )
+    for path in result.skipped:
+        click.echo(f"Could not read: {path}", err=True)
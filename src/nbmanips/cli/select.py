@@ -3,11 +3,11 @@ import re
 from functools import reduce
 
 import click
-import cloudpickle
 from click import Group
 
 from nbmanips.cli import get_selector
 from nbmanips.selector import Selector
+from nbmanips.selector.serialization import to_json
 
 __all__ = [
     "select",
@@ -87,10 +87,20 @@ def get_params(ctx, **kwargs):
     return {
         "or_": ctx.parent.params["or_"] or ctx.params["or_"],
         "invert": ctx.parent.params["invert"] or ctx.params["invert"],
+        "explain": ctx.parent.params["explain"],
+        "context": _get_context(**ctx.parent.params),
         "kwargs": kwargs,
     }
 
 
+def _get_context(context, before, after, **_):
+    before = context if before is None else before
+    after = context if after is None else after
+    if not before and not after:
+        return None
+    return before or 0, after or 0
+
+
 def select_params(func):
     decorators = [
         click.option("--or", "-o", "or_", is_flag=True, default=False),
@@ -103,6 +113,33 @@ def select_params(func):
 
 @click.group(cls=SelectGroup)
 @select_params
+@click.option(
+    "--explain",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Profile the selector on the given notebook (report printed on stderr)",
+)
+@click.option(
+    "--context",
+    "-C",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Also select the N cells before and after each selected cell",
+)
+@click.option(
+    "--before",
+    "-B",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Also select the N cells before each selected cell",
+)
+@click.option(
+    "--after",
+    "-A",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Also select the N cells after each selected cell",
+)
 def select(**_):
     pass
 
@@ -156,21 +193,29 @@ def has_slide_type(ctx, slide_type, **_):
 @click.argument("text", type=str, required=True)
 @click.option("--case", "-c", is_flag=True, default=False)
 @click.option("--include-output", "-n", "output", is_flag=True, default=False)
+@click.option(
+    "--raw-output",
+    is_flag=True,
+    default=False,
+    help="search in the raw text of the outputs, without rendering them",
+)
 @click.option("--regex", "-r", is_flag=True, default=False)
 @select_params
 @click.pass_context
-def contains(ctx, text, case, output, regex, **_):
+def contains(ctx, text, case, output, raw_output, regex, **_):
     params = get_params(
         ctx,
         case=case,
-        output=output,
+        output="raw" if raw_output else output,
         regex=regex,
     )
 
     _select_unknown("contains", [text], **params)
 
 
-def _select_unknown(selector, arguments, kwargs, or_, invert):
+def _select_unknown(
+    selector, arguments, kwargs, or_, invert, explain=None, context=None
+):
     sel = Selector(selector, *arguments, **kwargs)
     if invert:
         sel = ~sel
@@ -179,4 +224,14 @@ def _select_unknown(selector, arguments, kwargs, or_, invert):
     if piped_selector is not None:
         sel = (piped_selector | sel) if or_ else (piped_selector & sel)
 
-    click.echo(cloudpickle.dumps(sel), nl=False)
+    if context is not None:
+        from nbmanips.selector.context_selector import ContextSelector
+
+        sel = ContextSelector(sel, *context)
+
+    if explain is not None:
+        from nbmanips import Notebook
+
+        click.echo(Notebook.read(explain).select(sel).explain(), err=True)
+
+    click.echo(to_json(sel))
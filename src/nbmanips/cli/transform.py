@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 import os.path
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from functools import reduce
 from operator import add
 
 import click
 
 from nbmanips import Notebook
-from nbmanips.cli import export, get_selector
+from nbmanips.cli import export, get_selector, read_notebook, selector_option
 
 __all__ = [
     "erase",
@@ -31,8 +32,9 @@ __all__ = [
     default=False,
     help="Do not prompt for confirmation if file already exists",
 )
+@selector_option
 def erase(notebook_path: str, output: str | None, force: bool):
-    nb = Notebook.read(notebook_path)
+    nb = read_notebook(notebook_path)
     selector = get_selector()
 
     nb.select(selector).erase()
@@ -49,8 +51,9 @@ def erase(notebook_path: str, output: str | None, force: bool):
     default=False,
     help="Do not prompt for confirmation if file already exists",
 )
+@selector_option
 def delete(notebook_path, output, force):
-    nb = Notebook.read(notebook_path)
+    nb = read_notebook(notebook_path)
     selector = get_selector()
 
     nb.select(selector).delete()
@@ -67,8 +70,9 @@ def delete(notebook_path, output, force):
     default=False,
     help="Do not prompt for confirmation if file already exists",
 )
+@selector_option
 def keep(notebook_path, output, force):
-    nb = Notebook.read(notebook_path)
+    nb = read_notebook(notebook_path)
     selector = get_selector()
 
     nb.select(selector).keep()
@@ -78,8 +82,16 @@ def keep(notebook_path, output, force):
 @click.command(help="replace string in all selected cells")
 @click.argument("notebook_path")
 @click.option("--output", "-o", default=None)
-@click.option("--old", "-t", required=True)
-@click.option("--new", "-n", required=True)
+@click.option("--old", "-t", default=None)
+@click.option("--new", "-n", default=None)
+@click.option(
+    "--mapping-file",
+    "-F",
+    type=click.File("r"),
+    default=None,
+    help="Apply all the replacements of this file (one `old<TAB>new` per line)"
+    " in a single pass",
+)
 @click.option("--count", "--max", "-m", "count_", type=int, default=None)
 @click.option("--regex", "-r", is_flag=True, default=False)
 @click.option("--case/--no-case", "-c/-nc", default=True)
@@ -90,14 +102,42 @@ def keep(notebook_path, output, force):
     default=False,
     help="Do not prompt for confirmation if file already exists",
 )
-def replace(notebook_path, output, old, new, case, count_, regex, force):
-    nb = Notebook.read(notebook_path)
+@selector_option
+def replace(notebook_path, output, old, new, mapping_file, case, count_, regex, force):
+    if mapping_file is None and (old is None or new is None):
+        raise click.UsageError("Provide either --old and --new, or --mapping-file")
+    if mapping_file is not None and (old, new, count_) != (None, None, None):
+        raise click.UsageError(
+            "--mapping-file cannot be used with --old, --new or --count"
+        )
+
+    mapping = None if mapping_file is None else _read_mapping(mapping_file)
+    nb = read_notebook(notebook_path)
     selector = get_selector()
 
-    nb.select(selector).replace(old, new, count_, case, regex)
+    if mapping is None:
+        nb.select(selector).replace(old, new, count_, case, regex)
+    else:
+        nb.select(selector).replace_many(mapping, regex, case)
     export(nb, notebook_path, output, force=force)
 
 
+def _read_mapping(mapping_file) -> dict[str, str]:
+    mapping = {}
+    for line_number, raw_line in enumerate(mapping_file, start=1):
+        line = raw_line.rstrip("\r\n")
+        if not line:
+            continue
+        if "\t" not in line:
+            raise click.BadParameter(
+                f"line {line_number}: expected `old<TAB>new`",
+                param_hint="--mapping-file",
+            )
+        old, new = line.split("\t", 1)
+        mapping[old] = new
+    return mapping
+
+
 @click.command(help="replace string in all selected cells")
 @click.argument("notebook_path")
 @click.option("--output", "-o", default=None)
@@ -111,8 +151,9 @@ def replace(notebook_path, output, old, new, case, count_, regex, force):
     default=False,
     help="Do not prompt for confirmation if file already exists",
 )
+@selector_option
 def auto_slide(notebook_path, output, max_cells, max_images, delete_empty, force):
-    nb = Notebook.read(notebook_path)
+    nb = read_notebook(notebook_path)
     selector = get_selector()
 
     nb.select(selector).auto_slide(max_cells, max_images, delete_empty=delete_empty)
@@ -130,8 +171,9 @@ def auto_slide(notebook_path, output, max_cells, max_images, delete_empty, force
     default=False,
     help="Do not prompt for confirmation if file already exists",
 )
+@selector_option
 def erase_output(notebook_path, output, output_types, force):
-    nb = Notebook.read(notebook_path)
+    nb = read_notebook(notebook_path)
     selector = get_selector()
 
     output_types = set(output_types) if output_types else None
@@ -145,6 +187,13 @@ def erase_output(notebook_path, output, output_types, force):
 @click.option("--output", "-o", default=None)
 @click.option("--index", "-i", multiple=True)
 @click.option("--use-selection", "-s", is_flag=True, default=False)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of notebooks to write concurrently",
+)
 @click.option(
     "--force",
     "-f",
@@ -152,7 +201,8 @@ def erase_output(notebook_path, output, output_types, force):
     default=False,
     help="Do not prompt for confirmation if file already exists",
 )
-def split(notebook_path, output, indexes, index, force, use_selection):
+@selector_option
+def split(notebook_path, output, indexes, index, force, use_selection, jobs):
     if index or indexes:
         indexes = reduce(
             add, [index.split(",") for index in list(indexes) + list(index)]
@@ -168,16 +218,35 @@ def split(notebook_path, output, indexes, index, force, use_selection):
     selector = get_selector()
 
     if use_selection:
-        nbs = nb.select(selector).split_on_selection()
+        nbs = nb.select(selector).iter_split_on_selection()
     else:
-        nbs = nb.select(selector).split(*indexes)
+        nbs = nb.select(selector).iter_split(*indexes)
 
     # Exporting
     base, ext = os.path.splitext(notebook_path)
     input_path = base + "-%d" + ext
-    for i, nb in enumerate(nbs):
-        output_path = output % i if output else None
-        export(nb, input_path % i, output_path, force=force)
+    exports = (
+        (nb, input_path % i, output % i if output else None) for i, nb in enumerate(nbs)
+    )
+    if jobs == 1:
+        for nb, input_path_i, output_path in exports:
+            export(nb, input_path_i, output_path, force=force)
+        return
+
+    # Writing at most `jobs` notebooks at a time
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = set()
+        for nb, input_path_i, output_path in exports:
+            if len(pending) >= jobs:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(
+                executor.submit(export, nb, input_path_i, output_path, force=force)
+            )
+
+        for future in pending:
+            future.result()
 
 
 @click.command(help="Burn the images in markdown cells as attachments")
@@ -203,10 +272,11 @@ def split(notebook_path, output, indexes, index, force, use_selection):
     default=False,
     help="Do not prompt for confirmation if file already exists",
 )
+@selector_option
 def burn(
     notebook_path: str, assets_path: str, output: str | None, force: bool, html: bool
 ):
-    nb = Notebook.read(notebook_path)
+    nb = read_notebook(notebook_path)
     selector = get_selector()
 
     nb.select(selector).burn_attachments(assets_path=assets_path, html=html)
@@ -1,11 +1,34 @@
 from __future__ import annotations
 
+import io
 import json
 import os
 import zipfile
 
 from nbmanips.notebook.notebook import Notebook
 
+# -- Constants --
+COMPRESSION_METHODS = {
+    "stored": zipfile.ZIP_STORED,
+    "deflate": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+
+
+def _get_compression(compression: str) -> int:
+    try:
+        return COMPRESSION_METHODS[compression]
+    except KeyError:
+        raise ValueError(
+            f"compression should be in {set(COMPRESSION_METHODS)}: {compression!r}"
+        ) from None
+
+
+def _write_json(zf: zipfile.ZipFile, name: str, content: dict) -> None:
+    with zf.open(name, mode="w") as f, io.TextIOWrapper(f, encoding="utf-8") as fp:
+        json.dump(content, fp)
+
 
 def _parent_directory(path: str) -> str:
     return os.path.abspath(os.path.join(path, os.pardir))
@@ -96,12 +119,23 @@ class DbcExporter:
         return notebook
 
     def export(
-        self, nb: Notebook, output_path: str, filename: str | None = None, **kwargs
+        self,
+        nb: Notebook,
+        output_path: str,
+        filename: str | None = None,
+        compression: str = "deflate",
+        compresslevel: int | None = None,
+        **kwargs,
     ) -> None:
         dbc_nb = self._to_dbc_notebook(nb, **kwargs)
         filename = filename or f"{dbc_nb['name']}.{dbc_nb['language']}"
-        with zipfile.ZipFile(output_path, mode="w") as zf:
-            zf.writestr(filename, json.dumps(dbc_nb))
+        with zipfile.ZipFile(
+            output_path,
+            mode="w",
+            compression=_get_compression(compression),
+            compresslevel=compresslevel,
+        ) as zf:
+            _write_json(zf, filename, dbc_nb)
 
     @staticmethod
     def _check_common_path(file_list: list[str], common_path: str | None) -> str:
@@ -123,14 +157,24 @@ class DbcExporter:
         return common_path
 
     def write_dbc(
-        self, file_list: list[str], output_path: str, common_path: str | None = None
+        self,
+        file_list: list[str],
+        output_path: str,
+        common_path: str | None = None,
+        compression: str = "deflate",
+        compresslevel: int | None = None,
     ) -> None:
         # absolute paths
         file_list = [os.path.abspath(file) for file in file_list]
         common_path = self._check_common_path(file_list, common_path)
 
         dirs = set()
-        with zipfile.ZipFile(output_path, mode="w") as zf:
+        with zipfile.ZipFile(
+            output_path,
+            mode="w",
+            compression=_get_compression(compression),
+            compresslevel=compresslevel,
+        ) as zf:
             for file_path in file_list:
                 dbc_nb = self._to_dbc_notebook(Notebook.read_ipynb(file_path))
                 default_filename = (
@@ -141,7 +185,7 @@ class DbcExporter:
                 zip_path = os.path.join(
                     os.path.relpath(parent_path, common_path), default_filename
                 )
-                zf.writestr(zip_path, json.dumps(dbc_nb))
+                _write_json(zf, zip_path, dbc_nb)
 
             for directory in dirs:
                 zip_info = zipfile.ZipInfo(directory + "/")
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import glob
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+from nbmanips.notebook import Notebook
+
+__all__ = ["grep", "grep_notebook", "iter_notebook_paths", "GrepHit", "GrepResult"]
+
+
+_GLOB_MAGIC = re.compile(r"[*?[]")
+
+
+class GrepHit(NamedTuple):
+    path: str
+    cell: int
+    line: int
+    text: str
+
+    def __str__(self) -> str:
+        return f"{self.path}:{self.cell}:{self.line}: {self.text}"
+
+
+class GrepResult(NamedTuple):
+    path: str
+    hits: list[GrepHit]
+    error: str | None = None
+
+
+def grep(
+    pattern: str,
+    paths: Iterable[str],
+    recursive: bool = False,
+    regex: bool = False,
+    case: bool = True,
+    max_count: int | None = None,
+    jobs: int = 1,
+) -> Iterator[GrepResult]:
+    """
+    Searches a pattern in the lines of the cells of several notebooks.
+    The notebooks are searched by a pool of `jobs` processes, and the results are
+    yielded in the order of the paths.
+
+    :param pattern: text to search
+    :param paths: paths of notebooks, directories or glob patterns
+    :param recursive: True to search the notebooks of the directories recursively
+    :param regex: True if the pattern is a regular expression
+    :param case: True if the search is case-sensitive
+    :param max_count: maximum number of matching lines per notebook
+    :param jobs: number of processes
+    :return: an iterator of results, one per notebook
+    """
+    search = partial(
+        grep_notebook, pattern=pattern, regex=regex, case=case, max_count=max_count
+    )
+    paths = iter_notebook_paths(paths, recursive=recursive)
+    if jobs == 1:
+        yield from map(search, paths)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(search, paths, chunksize=8)
+
+
+def grep_notebook(
+    path: str,
+    pattern: str,
+    regex: bool = False,
+    case: bool = True,
+    max_count: int | None = None,
+) -> GrepResult:
+    """
+    Searches a pattern in the lines of the cells of a notebook.
+    The raw file is checked first, so notebooks that cannot match are not parsed.
+
+    :param path: path of the notebook
+    :param pattern: text to search
+    :param regex: True if the pattern is a regular expression
+    :param case: True if the search is case-sensitive
+    :param max_count: maximum number of matching lines
+    :return: the matching lines, or the error raised while reading the notebook
+    """
+    if Path(path).is_dir():
+        return GrepResult(path, [], "Is a directory")
+
+    flags = 0 if case else re.IGNORECASE
+    try:
+        if Path(path).suffix != ".ipynb":
+            nb = Notebook.read(path)
+        else:
+            content = Path(path).read_bytes()
+            prefilter = _get_prefilter(pattern, regex, flags)
+            if prefilter is not None and prefilter.search(content) is None:
+                return GrepResult(path, [])
+            nb = Notebook.from_json(content.decode("utf-8"), fields=("source",))
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        return GrepResult(path, [], str(e))
+
+    search = re.compile(pattern if regex else re.escape(pattern), flags).search
+    hits: list[GrepHit] = []
+    for cell in nb.iter_cells():
+        for line_number, line in enumerate(cell.get_source().splitlines(), start=1):
+            if search(line) is None:
+                continue
+            hits.append(GrepHit(path, cell.num, line_number, line))
+            if max_count is not None and len(hits) >= max_count:
+                return GrepResult(path, hits)
+    return GrepResult(path, hits)
+
+
+def iter_notebook_paths(paths: Iterable[str], recursive: bool = False) -> Iterator[str]:
+    """
+    Lists the notebooks of a list of files, directories and glob patterns,
+    in a deterministic order. Directories are yielded as is if not recursive.
+    """
+    seen = set()
+    for path in paths:
+        if Path(path).is_dir() and recursive:
+            matches = (
+                str(notebook)
+                for notebook in sorted(Path(path).rglob("*.ipynb"))
+                if ".ipynb_checkpoints" not in notebook.parts and notebook.is_file()
+            )
+        elif not Path(path).exists() and _GLOB_MAGIC.search(path):
+            matches = sorted(glob.glob(path, recursive=True))
+        else:
+            matches = [path]
+
+        for match in matches:
+            if match not in seen:
+                seen.add(match)
+                yield match
+
+
+def _get_prefilter(pattern: str, regex: bool, flags: int) -> re.Pattern | None:
+    """
+    Returns a regex searching the pattern in the raw JSON of a notebook,
+    if it is written in the same way there.
+    """
+    # the lines of the cells are JSON strings: only the patterns that are not
+    # escaped in JSON can be found as is (some writers also escape non-ASCII and `/`)
+    if regex or not pattern.isascii() or "/" in pattern:
+        return None
+    if json.dumps(pattern)[1:-1] != pattern:
+        return None
+    return re.compile(re.escape(pattern.encode()), flags)
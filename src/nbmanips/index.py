@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import sqlite3
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+from nbmanips.notebook import Notebook
+
+__all__ = ["NotebookIndex", "Hit", "UpdateResult", "DEFAULT_INDEX_NAME", "tokenize"]
+
+DEFAULT_INDEX_NAME = ".nbindex.sqlite"
+FIELDS = ("source", "output")
+
+# bumped when the layout of the index changes
+_SCHEMA_VERSION = 1
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    n_cells INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    cell INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS postings_term ON postings (term);
+CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+"""
+
+_TOKEN = re.compile(r"\w+")
+
+
+class Hit(NamedTuple):
+    path: str
+    cell: int
+    score: float
+
+    def __str__(self) -> str:
+        return f"{self.path}:{self.cell}"
+
+
+class UpdateResult(NamedTuple):
+    indexed: int
+    unchanged: int
+    removed: int
+    skipped: list[str]
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class NotebookIndex:
+    """
+    Inverted index (term -> notebook, cell, field) of the notebooks of a directory,
+    stored in SQLite
+    """
+
+    def __init__(self, root: str | Path, index_path: str | Path | None = None):
+        """
+        :param root: directory of the notebooks
+        :param index_path: path of the index file (default: `root/.nbindex.sqlite`)
+        """
+        self.root = Path(root)
+        if index_path is None:
+            index_path = self.root / DEFAULT_INDEX_NAME
+        self.index_path = Path(index_path)
+        self._connection: sqlite3.Connection | None = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.index_path)
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version not in {0, _SCHEMA_VERSION}:
+                connection.close()
+                raise ValueError(
+                    f"Unsupported index version {version}: rebuild the index"
+                )
+            connection.executescript(_SCHEMA)
+            connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            self._connection = connection
+        return self._connection
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def build(self) -> UpdateResult:
+        """
+        Indexes all the notebooks of the directory from scratch
+        """
+        with self.connection as connection:
+            connection.execute("DELETE FROM postings")
+            connection.execute("DELETE FROM files")
+        return self.update()
+
+    def update(self) -> UpdateResult:
+        """
+        Reindexes the notebooks that were added or modified since the last update,
+        and drops the deleted ones. Modification times are checked first, then
+        the content hash.
+        """
+        connection = self.connection
+        known = {
+            path: (file_id, mtime, size, digest)
+            for file_id, path, mtime, size, digest in connection.execute(
+                "SELECT id, path, mtime, size, hash FROM files"
+            )
+        }
+
+        indexed = unchanged = 0
+        skipped = []
+        for path in self._iter_notebooks():
+            key = path.relative_to(self.root).as_posix()
+            stat = path.stat()
+            file_id, mtime, size, digest = known.pop(key, (None, None, None, None))
+            if (mtime, size) == (stat.st_mtime, stat.st_size):
+                unchanged += 1
+                continue
+
+            content = path.read_bytes()
+            new_digest = hashlib.sha256(content).hexdigest()
+            with connection:
+                if new_digest == digest:
+                    connection.execute(
+                        "UPDATE files SET mtime = ?, size = ? WHERE id = ?",
+                        (stat.st_mtime, stat.st_size, file_id),
+                    )
+                    unchanged += 1
+                    continue
+
+                try:
+                    nb = Notebook.from_json(content.decode("utf-8"))
+                except (ValueError, KeyError, TypeError):
+                    skipped.append(key)
+                    nb = None
+                finally:
+                    if file_id is not None:
+                        self._delete(file_id)
+
+                if nb is None:
+                    continue
+                cursor = connection.execute(
+                    "INSERT INTO files (path, mtime, size, hash, n_cells) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, stat.st_mtime, stat.st_size, new_digest, len(nb.cells)),
+                )
+                connection.executemany(
+                    "INSERT INTO postings VALUES (?, ?, ?, ?, ?)",
+                    _iter_postings(nb, cursor.lastrowid),
+                )
+                indexed += 1
+
+        # the remaining files were deleted
+        with connection:
+            for file_id, *_ in known.values():
+                self._delete(file_id)
+
+        return UpdateResult(indexed, unchanged, len(known), skipped)
+
+    def search(
+        self, text: str, output: bool = False, limit: int | None = None
+    ) -> list[Hit]:
+        """
+        Returns the cells containing all the words of the text, best matches first.
+        The cells are ranked by the frequency of the words, weighted by their rarity.
+
+        :param text: words to search
+        :param output: True to search the outputs of the cells too
+        :param limit: maximum number of hits
+        :return: a list of hits (path relative to the root directory, cell number)
+        """
+        terms = set(tokenize(text))
+        if not terms:
+            return []
+
+        fields = FIELDS if output else FIELDS[:1]
+        # only the placeholders are formatted in the query
+        query = (
+            "SELECT f.path, p.cell, p.term, SUM(p.count) "  # noqa: S608
+            "FROM postings p JOIN files f ON f.id = p.file_id "
+            f"WHERE p.term IN ({', '.join('?' * len(terms))}) "
+            f"AND p.field IN ({', '.join('?' * len(fields))}) "
+            "GROUP BY f.path, p.cell, p.term"
+        )
+        counts: dict[tuple[str, int], dict[str, int]] = defaultdict(dict)
+        for path, cell, term, count in self.connection.execute(
+            query, (*terms, *fields)
+        ):
+            counts[path, cell][term] = count
+
+        n_cells = self.connection.execute(
+            "SELECT COALESCE(SUM(n_cells), 0) FROM files"
+        ).fetchone()[0]
+        frequencies = Counter(term for cell in counts.values() for term in cell)
+        idf = {term: math.log(1 + n_cells / df) for term, df in frequencies.items()}
+
+        hits = [
+            Hit(
+                path, cell, sum(count * idf[term] for term, count in cell_terms.items())
+            )
+            for (path, cell), cell_terms in counts.items()
+            if len(cell_terms) == len(terms)
+        ]
+        hits.sort(key=lambda hit: (-hit.score, hit.path, hit.cell))
+        return hits[:limit]
+
+    def _iter_notebooks(self) -> Iterator[Path]:
+        for path in sorted(self.root.rglob("*.ipynb")):
+            if ".ipynb_checkpoints" not in path.parts and path.is_file():
+                yield path
+
+    def _delete(self, file_id: int) -> None:
+        self.connection.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+        self.connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+
+def _iter_postings(nb: Notebook, file_id: int) -> Iterable[tuple]:
+    for cell in nb.iter_cells():
+        for field, text in (("source", cell.source), ("output", cell.raw_output)):
+            for term, count in Counter(tokenize(text)).items():
+                yield term, file_id, cell.num, field, count
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+from collections.abc import ItemsView, ValuesView
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
 
 import nbformat
 
 from nbmanips.notebook.notebook import Notebook, RawNotebookType
 
+if TYPE_CHECKING:
+    from nbmanips.selector import SelectorBase
+
+# heavy cell fields that can be left out when reading a notebook, with their
+# placeholder value
+OPTIONAL_FIELDS = {"source": "", "outputs": [], "attachments": None, "metadata": {}}
+
 
 class IPYNB(Notebook):
     def __new__(cls, path: str, name: str | None = None) -> Notebook:
@@ -24,11 +33,79 @@ def get_nb_from_dict(
     return nbformat.convert(nb, as_version)
 
 
-def read_ipynb(notebook_path: str, version: int = 4) -> RawNotebookType:
+def read_ipynb(
+    notebook_path: str,
+    version: int = 4,
+    select: SelectorBase | None = None,
+    fields: Iterable[str] | None = None,
+) -> RawNotebookType:
     s = Path(notebook_path).read_text(encoding="utf-8")
-    nb = nbformat.reader.reads(s)
-    nb = nbformat.convert(nb, version)
-    return dict(nb)
+    return loads_ipynb(s, version, select=select, fields=fields)
+
+
+def loads_ipynb(
+    s: str,
+    version: int = 4,
+    select: SelectorBase | None = None,
+    fields: Iterable[str] | None = None,
+) -> RawNotebookType:
+    """
+    Parses an ipynb json string
+
+    :param s: json content of the notebook
+    :param version: nbformat version to convert the notebook to
+    :param select: structural selector: only the matching cells are parsed
+    :param fields: cell fields to read among `OPTIONAL_FIELDS`
+     (the other ones are replaced by empty values). Reads all the fields if None.
+    :return: raw notebook
+    """
+    if select is None and fields is None:
+        nb = nbformat.reader.reads(s)
+        return dict(nbformat.convert(nb, version))
+
+    nb_dict = nbformat.reader.parse_json(s)
+    major, minor = nbformat.reader.get_version(nb_dict)
+    if major != version:
+        nb = nbformat.convert(nbformat.reader.reads(s), version)
+        return _pushdown(dict(nb), select, fields)
+
+    # the cells are filtered before being converted to NotebookNodes
+    nb_dict = _pushdown(nb_dict, select, fields)
+    nb = nbformat.versions[major].to_notebook_json(nb_dict, minor=minor)
+    return dict(nbformat.convert(nb, version))
+
+
+def _pushdown(
+    nb_dict: RawNotebookType,
+    select: SelectorBase | None,
+    fields: Iterable[str] | None,
+) -> RawNotebookType:
+    if select is not None and not select.structural:
+        raise ValueError("Only structural selectors can be evaluated while reading")
+
+    cells = nb_dict.get("cells", [])
+    if select is not None:
+        cells = [cell.cell for cell in select.iter_cells(nb_dict)]
+
+    if fields is not None:
+        skipped = OPTIONAL_FIELDS.keys() - set(fields)
+        cells = [_project(cell, skipped) for cell in cells]
+
+    return {**nb_dict, "cells": cells}
+
+
+def _project(cell: dict[str, Any], skipped: Iterable[str]) -> dict[str, Any]:
+    cell = dict(cell)
+    for field in skipped:
+        if field not in cell:
+            continue
+
+        placeholder = OPTIONAL_FIELDS[field]
+        if placeholder is None:
+            del cell[field]
+        else:
+            cell[field] = type(placeholder)()
+    return cell
 
 
 def write_ipynb(
@@ -41,7 +118,98 @@ def write_ipynb(
 
 
 def dict_to_ipynb(
-    nb_dict: RawNotebookType, default_version: int = 4
+    nb_dict: RawNotebookType, default_version: int = 4, copy: bool = True
 ) -> nbformat.NotebookNode:
     version = nb_dict.get("nbformat", default_version)
+    if not copy and version == nbformat.current_nbformat:
+        return NotebookNodeView(nb_dict)
     return get_nb_from_dict(nb_dict, as_version=version)
+
+
+class NotebookNodeView(nbformat.NotebookNode):
+    """
+    NotebookNode presenting an existing notebook dict without copying it.
+
+    Nested dicts and lists are wrapped on first access, and leaf values
+    (sources, outputs, attachments, ...) are shared with the original dict.
+    Multi-line values are rejoined on access, like nbformat does when reading.
+    """
+
+    # part of the notebook presented by the node (e.g. "cell"), used to find
+    # the multi-line values
+    _kind: str | None = "notebook"
+
+    def __getitem__(self, key: Any) -> Any:
+        value = dict.__getitem__(self, key)
+        wrapped = _wrap_value(
+            value, _get_child_kind(self._kind, key), _is_multiline_key(self, key)
+        )
+        if wrapped is not value:
+            dict.__setitem__(self, key, wrapped)
+        return wrapped
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self) -> ItemsView:
+        return ItemsView(self)
+
+    def values(self) -> ValuesView:
+        return ValuesView(self)
+
+
+# kind of the dicts found under a key of a dict of a given kind
+_CHILD_KINDS = {
+    ("notebook", "cells"): "cell",
+    ("cell", "outputs"): "output",
+    ("cell", "attachments"): "attachments",
+    ("output", "data"): "mimebundle",
+}
+
+
+def _get_child_kind(kind: str | None, key: Any) -> str | None:
+    if kind == "attachments":
+        # each attachment is a mime bundle
+        return "mimebundle"
+    return _CHILD_KINDS.get((kind, key))
+
+
+def _is_multiline_key(node: NotebookNodeView, key: Any) -> bool:
+    """
+    The multi-line values are the cell sources, the texts of the stream outputs
+    and the non-JSON values of the mime bundles (see `nbformat.v4.rejoin_lines`)
+    """
+    if node._kind == "cell":
+        return key == "source"
+    if node._kind == "output":
+        return key == "text" and dict.get(node, "output_type") == "stream"
+    if node._kind != "mimebundle":
+        return False
+
+    return (
+        isinstance(key, str)
+        and "/" in key
+        and key != "application/json"
+        and not (key.startswith("application/") and key.endswith("+json"))
+    )
+
+
+def _wrap_value(value: Any, kind: str | None, multiline: bool) -> Any:
+    if isinstance(value, NotebookNodeView):
+        return value
+
+    if isinstance(value, dict):
+        node = NotebookNodeView(value)
+        object.__setattr__(node, "_kind", kind)
+        return node
+
+    if isinstance(value, list):
+        if multiline and all(isinstance(line, str) for line in value):
+            return "".join(value)
+        if any(isinstance(item, dict) for item in value):
+            return [_wrap_value(item, kind, False) for item in value]
+
+    return value
@@ -4,6 +4,8 @@ import json
 import re
 from contextlib import suppress
 from copy import deepcopy
+from functools import reduce
+from operator import and_
 from pathlib import Path
 from typing import (
     TYPE_CHECKING,
@@ -27,12 +29,21 @@ except ImportError:
     get_lexer_by_name = None
 
 import nbmanips.exporters as _nb_exporters
+from nbmanips.notebook.revision import Revision, get_fingerprint, get_revision
 from nbmanips.selector import Selector
+from nbmanips.selector.base_selectors import (
+    DEFAULT_COST,
+    ListSelector,
+    SelectorBase,
+    TrueSelector,
+)
 
 if TYPE_CHECKING:
     from nbconvert.exporters.exporter import Exporter
 
     from nbmanips.cell import Cell
+    from nbmanips.notebook.sections import Section
+    from nbmanips.selector.explain import Explanation
 
 T = TypeVar("T")
 
@@ -42,7 +53,7 @@ class RawNotebookType(TypedDict, total=False):
 
 
 class Notebook:
-    __slots__ = ("raw_nb", "name", "_selector", "_original_path")
+    __slots__ = ("raw_nb", "name", "_selector", "_original_path", "_revision")
     __exporters: ClassVar[dict[str, dict[str, type[Exporter]]]] = {
         "nbconvert": {
             "html": nbconvert.HTMLExporter,
@@ -76,6 +87,7 @@ class Notebook:
 
         self.name = name
         self._selector = Selector(None)
+        self._revision: Revision | None = None
 
     # == Properties ==
     @property
@@ -112,12 +124,87 @@ class Notebook:
 
         return toc
 
+    def sections(self) -> list[Section]:
+        """
+        Returns the sections of the notebook (heading level, title, first cell and
+        end cell). The heading index is built once and kept until the notebook
+        is modified.
+        """
+        from nbmanips.notebook.sections import get_sections
+
+        return list(get_sections(self.raw_nb))
+
+    def _get_revision(self) -> Revision:
+        revision = self._revision
+        if revision is None or revision.raw_nb is not self.raw_nb:
+            revision = self._revision = get_revision(self.raw_nb)
+        return revision
+
+    def _touch(self) -> None:
+        """
+        Drops the cached results after a mutation of the notebook
+        """
+        self._get_revision().bump()
+
     # == Selection ==
     def select(self, selector: Any, *args, **kwargs) -> Notebook:
         nb = self.reset_selection()
         nb._selector = self._selector & Selector(selector, *args, **kwargs)
         return nb
 
+    def query(self, expression: str) -> Notebook:
+        """
+        Selects the cells matching a selector expression, for example:
+        `nb.query("is_code & ~has_output_type('image/png')")`
+
+        :param expression: selector expression (see `nbmanips.selector.query`)
+        :return: a new Notebook object with the selection
+        """
+        from nbmanips.selector.query import parse_query
+
+        return self.select(parse_query(expression))
+
+    def with_context(self, before: int = 0, after: int = 0) -> Notebook:
+        """
+        Extends the selection with the cells around the selected cells
+
+        :param before: number of cells to add before each selected cell
+        :param after: number of cells to add after each selected cell
+        :return: a new Notebook object with the extended selection
+        """
+        from nbmanips.selector.context_selector import ContextSelector
+
+        nb = self.reset_selection()
+        nb._selector = ContextSelector(self._selector, before, after)
+        return nb
+
+    def materialize(self) -> Notebook:
+        """
+        Evaluates the selection once and stores the result in a bitmask.
+        The result is reused by the following operations, and materialized
+        selections of the same notebook are combined with bitwise operations.
+        Once the notebook is modified (see `iter_cells`), the selection
+        is evaluated again.
+
+        :return: a new Notebook object with the materialized selection
+        """
+        from nbmanips.selector.mask_selector import MaskSelector
+
+        nb = self.reset_selection()
+        nb._selector = MaskSelector.from_selector(self._selector, self.raw_nb)
+        return nb
+
+    def explain(self) -> Explanation:
+        """
+        Evaluates the selection and profiles each node of the selector:
+        wall time, number of calls, cells in/out and selectivity.
+
+        :return: an Explanation object (printable report)
+        """
+        from nbmanips.selector.explain import explain
+
+        return explain(self._selector, self.raw_nb)
+
     def reset_selection(self) -> Notebook:
         notebook_selection = Notebook(
             self.raw_nb, self.name, validate=False, copy=False
@@ -128,6 +215,8 @@ class Notebook:
         if original_path:
             notebook_selection._original_path = original_path
 
+        # the caches of the notebook live as long as this notebook object
+        notebook_selection._revision = self._get_revision()
         return notebook_selection
 
     # == Iterator ==
@@ -143,12 +232,52 @@ class Notebook:
 
         for num in reversed(delete_list):
             del self.cells[num]
+        self._touch()
 
     def map(self, func: Callable[[Cell], T], neg: bool = False) -> list[T]:
         return list(map(func, self.iter_cells(neg)))
 
-    def iter_cells(self, neg: bool = False) -> Iterator[Cell]:
-        return self._selector.iter_cells(self.raw_nb, neg=neg)
+    def iter_cells(self, neg: bool = False, reverse: bool = False) -> Iterator[Cell]:
+        """
+        Iterates over the selected cells
+
+        The selected cell numbers are cached until the notebook is modified. Most
+        edits made without the Notebook/Cell API (e.g. `cell.metadata[key] = value`
+        or `nb.cells[i]["cell_type"] = "raw"`) are also detected
+        (see `get_fingerprint`).
+
+        :param neg: True to iterate over the cells that are not selected
+        :param reverse: True to iterate from the last cell, e.g. to get the last
+         selected cells without evaluating the selector on the whole notebook
+        """
+        from nbmanips.cell import Cell
+
+        revision = self._get_revision()
+        cells = self.cells
+        cached = revision.selections.get(self._selector, {}).get(neg)
+        if (
+            cached is not None
+            and cached[0] is cells
+            and cached[1] == get_fingerprint(cells)
+        ):
+            for num in reversed(cached[2]) if reverse else cached[2]:
+                yield Cell(cells[num], num, revision)
+            return
+
+        # the selection is cached once fully evaluated, unless the notebook changed
+        version = revision.version
+        selection = []
+        for cell in self._selector.iter_cells(self.raw_nb, neg=neg, reverse=reverse):
+            cell._revision = revision
+            selection.append(cell.num)
+            yield cell
+
+        # checking the cache costs about as much as evaluating the cheap selectors
+        if revision.version == version and self._selector.cost >= DEFAULT_COST:
+            if reverse:
+                selection.reverse()
+            entry = (cells, get_fingerprint(cells), selection)
+            revision.selections.setdefault(self._selector, {})[neg] = entry
 
     def __iter__(self) -> Iterator[Cell]:
         return self.iter_cells()
@@ -167,7 +296,7 @@ class Notebook:
         Return the number of the last selected cell
         :return:
         """
-        for cell in reversed(list(self.iter_cells())):
+        for cell in self.iter_cells(reverse=True):
             return cell.num
 
     def list(self) -> list[int]:
@@ -197,7 +326,7 @@ class Notebook:
         Return the last selected cell
         :return:
         """
-        for cell in reversed(list(self.iter_cells())):
+        for cell in self.iter_cells(reverse=True):
             return cell
 
     def list_cells(self) -> list[Cell]:
@@ -217,6 +346,7 @@ class Notebook:
 
         cell = cell.get_copy(new_id)
         self.cells.insert(pos, cell.cell)
+        self._touch()
 
     def __add__(self, other: Notebook):
         if not isinstance(other, Notebook):
@@ -264,7 +394,7 @@ class Notebook:
     def __len__(self) -> int:
         if self.raw_nb is None or "cells" not in self.raw_nb:
             return 0
-        return len([*self.iter_cells()])
+        return sum(1 for _ in self.iter_cells())
 
     def __repr__(self) -> str:
         if self.name:
@@ -344,12 +474,14 @@ class Notebook:
         Delete the selected cells
         """
         self.raw_nb["cells"] = [cell.cell for cell in self.iter_cells(neg=True)]
+        self._touch()
 
     def keep(self) -> None:
         """
         Delete all the non-selected cells
         """
         self.raw_nb["cells"] = [cell.cell for cell in self.iter_cells()]
+        self._touch()
 
     def copy(self, selection: bool = True, crop: bool = True) -> Notebook:
         """
@@ -375,25 +507,51 @@ class Notebook:
         :param args:
         :return:
         """
-        return self.copy().select(args, type="or").split_on_selection()
+        return list(self.iter_split(*args))
 
     def split_on_selection(self) -> list[Notebook]:
         """
         Split the notebook based on the selected cells
         :return:
         """
-        cp = self.reset_selection()
-        notebooks = []
+        return list(self.iter_split_on_selection())
+
+    def iter_split(self, *args) -> Iterator[Notebook]:
+        """
+        Lazily split the notebook based passed selectors (typically cell indexes).
+        Each piece is only copied when it is reached.
+
+        :param args:
+        :return:
+        """
+        raw_nb = dict(self.raw_nb)
+        raw_nb["cells"] = [cell.cell for cell in self.iter_cells()]
+        nb = self.__class__(raw_nb, self.name, validate=False, copy=False)
+        return nb.select(args, type="or").iter_split_on_selection()
+
+    def iter_split_on_selection(self) -> Iterator[Notebook]:
+        """
+        Lazily split the notebook based on the selected cells.
+        Each piece is only copied when it is reached.
+
+        :return:
+        """
         prev = 0
         for cell in self.iter_cells():
             if cell.num == prev:
                 continue
 
-            notebooks.append(cp[prev : cell.num].copy())
+            yield self._copy_range(prev, cell.num)
 
             prev = cell.num
-        notebooks.append(cp[prev:].copy())
-        return notebooks
+        yield self._copy_range(prev, None)
+
+    def _copy_range(self, start: int, stop: int | None) -> Notebook:
+        raw_nb = {
+            key: deepcopy(value) for key, value in self.raw_nb.items() if key != "cells"
+        }
+        raw_nb["cells"] = deepcopy(self.cells[start:stop])
+        return self.__class__(raw_nb, self.name, validate=False, copy=False)
 
     # == SlideShowMixin ==
     def mark_slideshow(self) -> None:
@@ -468,7 +626,7 @@ class Notebook:
         self.select("with_css_selector", title_tags).set_slide()
 
         # Create a new slide only
-        for cell in reversed(list(self.iter_cells())):
+        for cell in list(self.iter_cells(reverse=True)):
             if cell.num > 0 and is_new_slide(
                 self[cell.num - 1].first_cell()
             ):  # previous cell is a new slide
@@ -500,13 +658,16 @@ class Notebook:
         """
         return json.dumps(self.raw_nb)
 
-    def to_notebook_node(self) -> nbformat.NotebookNode:
+    def to_notebook_node(self, copy: bool = True) -> nbformat.NotebookNode:
         """
         returns notebook as an nbformat NotebookNode
+
+        :param copy: if False, and the notebook is already in the current nbformat
+            version, returns a view sharing its content with the notebook.
         """
         from nbmanips.notebook.ipynb import dict_to_ipynb
 
-        return dict_to_ipynb(self.raw_nb)
+        return dict_to_ipynb(self.raw_nb, copy=copy)
 
     def convert(
         self,
@@ -533,7 +694,7 @@ class Notebook:
         template_name: str | None = None,
         **kwargs,
     ) -> None:
-        notebook_node = self.to_notebook_node()
+        notebook_node = self.to_notebook_node(copy=False)
 
         if template_name is not None:
             kwargs["template_name"] = template_name
@@ -672,6 +833,8 @@ class Notebook:
         name: str | None = None,
         language: str | None = None,
         version: str = "NotebookV1",
+        compression: str = "deflate",
+        compresslevel: int | None = None,
     ) -> None:
         """
         Exports Notebook to dbc archive file
@@ -681,6 +844,8 @@ class Notebook:
         :param name: name of the notebook
         :param language: language of the notebook
         :param version: version of dbc file (default is NotebookV1)
+        :param compression: compression of the archive: stored, deflate, bzip2 or lzma
+        :param compresslevel: compression level passed to zipfile
         :return:
         """
         self.convert(
@@ -691,9 +856,11 @@ class Notebook:
             name=name,
             language=language,
             version=version,
+            compression=compression,
+            compresslevel=compresslevel,
         )
 
-    def to_str(
+    def iter_str(
         self,
         width: int | None = None,
         exclude_output: bool = False,
@@ -704,14 +871,18 @@ class Notebook:
         parsers_config: dict[str, dict[str, Any]] | None = None,
         excluded_data_types: Iterable[str] | None = None,
         truncate: int | None = None,
-    ) -> str:
+    ) -> Iterator[str]:
+        """
+        Yields the visual representation of the selected cells, one cell at a time.
+        Takes the same parameters as `to_str`.
+        """
         from nbmanips.cell.cell_utils import PYGMENTS_SUPPORTED
 
         use_pygments = PYGMENTS_SUPPORTED if use_pygments is None else use_pygments
         pygments_lexer = _get_pygments_lexer(self, use_pygments)
 
-        return "\n".join(
-            cell.to_str(
+        for cell in self.iter_cells():
+            yield cell.to_str(
                 width=width,
                 exclude_output=exclude_output,
                 use_pygments=use_pygments,
@@ -723,7 +894,31 @@ class Notebook:
                 excluded_data_types=excluded_data_types,
                 truncate=truncate,
             )
-            for cell in self.iter_cells()
+
+    def to_str(
+        self,
+        width: int | None = None,
+        exclude_output: bool = False,
+        use_pygments: bool | None = None,
+        style: str = "single",
+        border_color: str | None = None,
+        parsers: Iterable[str] | None = None,
+        parsers_config: dict[str, dict[str, Any]] | None = None,
+        excluded_data_types: Iterable[str] | None = None,
+        truncate: int | None = None,
+    ) -> str:
+        return "\n".join(
+            self.iter_str(
+                width=width,
+                exclude_output=exclude_output,
+                use_pygments=use_pygments,
+                style=style,
+                border_color=border_color,
+                parsers=parsers,
+                parsers_config=parsers_config,
+                excluded_data_types=excluded_data_types,
+                truncate=truncate,
+            )
         )
 
     def to_text(self, path: str, *args, **kwargs) -> None:
@@ -734,9 +929,12 @@ class Notebook:
         :param kwargs:
         :return:
         """
-        content = self.to_str(*args, use_pygments=False, border_color=False, **kwargs)
+        cells = self.iter_str(*args, use_pygments=False, border_color=False, **kwargs)
         with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
+            for i, content in enumerate(cells):
+                if i:
+                    f.write("\n")
+                f.write(content)
 
     def to_ipynb(self, path: str) -> None:
         """
@@ -758,6 +956,7 @@ class Notebook:
         parsers_config: dict[str, dict[str, Any]] | None = None,
         excluded_data_types: Iterable[str] | None = None,
         truncate: int | None = None,
+        pager: bool = False,
     ) -> None:
         """
         Show the selected cells
@@ -770,8 +969,9 @@ class Notebook:
         :param parsers_config:
         :param excluded_data_types: output data types to exclude in the output
         :param truncate: maximum number of characters to keep. Anything beyond is truncated
+        :param pager: display the cells through the pager ($PAGER) as they are rendered
         """
-        str_repr = self.to_str(
+        cells = self.iter_str(
             width=width,
             use_pygments=use_pygments,
             exclude_output=exclude_output,
@@ -782,29 +982,76 @@ class Notebook:
             excluded_data_types=excluded_data_types,
             truncate=truncate,
         )
-        if str_repr:
-            print(str_repr)
+        if pager:
+            import click
+
+            click.echo_via_pager(
+                f"\n{content}" if i else content for i, content in enumerate(cells)
+            )
+            return
+
+        for content in cells:
+            print(content)
 
     # == Readers ==
     @classmethod
     def read_ipynb(
-        cls, path: str, name: str | None = None, validate: bool = False
+        cls,
+        path: str,
+        name: str | None = None,
+        validate: bool = False,
+        select: Any = None,
+        fields: Iterable[str] | None = None,
     ) -> Notebook:
         """
         Read ipynb file
         :param path: path to the ipynb file
         :param name: name of the Notebook
         :param validate: validate the notebook fields
+        :param select: only read the cells matching this selector
+        :param fields: cell fields to read (source, outputs, attachments, metadata).
+         The other ones are left empty. Reads all the fields if None.
         :return: Notebook object
         """
         from nbmanips.notebook.ipynb import get_ipynb_name, read_ipynb
 
-        nb = read_ipynb(path)
+        pushdown, residual = _split_pushdown(select)
+        if residual is not None:
+            fields = None
+
+        nb = read_ipynb(path, select=pushdown, fields=fields)
         nb_obj = cls(nb, name or get_ipynb_name(path), validate=validate, copy=False)
 
         nb_obj._original_path = path
 
-        return nb_obj
+        return nb_obj._crop(residual)
+
+    @classmethod
+    def from_json(
+        cls,
+        content: str,
+        name: str | None = None,
+        validate: bool = False,
+        select: Any = None,
+        fields: Iterable[str] | None = None,
+    ) -> Notebook:
+        """
+        Read notebook from a json string (ipynb format)
+        :param content: json content of the notebook
+        :param name: name of the Notebook
+        :param validate: validate the notebook fields
+        :param select: only read the cells matching this selector
+        :param fields: cell fields to read (see `read_ipynb`)
+        :return: Notebook object
+        """
+        from nbmanips.notebook.ipynb import loads_ipynb
+
+        pushdown, residual = _split_pushdown(select)
+        if residual is not None:
+            fields = None
+
+        nb = loads_ipynb(content, select=pushdown, fields=fields)
+        return cls(nb, name, validate=validate, copy=False)._crop(residual)
 
     @classmethod
     def read_dbc(
@@ -843,12 +1090,36 @@ class Notebook:
 
     @classmethod
     def read(
-        cls, path: str, name: str | None = None, validate: bool = False, **kwargs
+        cls,
+        path: str,
+        name: str | None = None,
+        validate: bool = False,
+        select: Any = None,
+        fields: Iterable[str] | None = None,
+        **kwargs,
     ) -> Notebook:
-        readers: dict[str, Callable[[str, str | None, bool], Notebook]] = {
-            ".ipynb": cls.read_ipynb,
-            ".dbc": cls.read_dbc,
-            ".zpln": cls.read_zpln,
+        """
+        Read a notebook file (ipynb, dbc or zpln)
+        :param path: path to the notebook
+        :param name: name of the Notebook
+        :param validate: validate the notebook fields
+        :param select: only read the cells matching this selector. Structural
+         selectors (cell types, tags, indexes) are evaluated before parsing the cells.
+        :param fields: cell fields to read (source, outputs, attachments, metadata).
+         It is a hint: the other fields might be left empty.
+        :return: Notebook object
+        """
+
+        def read_ipynb(*args, **kwargs) -> Notebook:
+            return cls.read_ipynb(*args, select=select, fields=fields, **kwargs)
+
+        def read_other(reader: Callable[..., Notebook]) -> Callable[..., Notebook]:
+            return lambda *args, **kwargs: reader(*args, **kwargs)._crop(select)
+
+        readers: dict[str, Callable[..., Notebook]] = {
+            ".ipynb": read_ipynb,
+            ".dbc": read_other(cls.read_dbc),
+            ".zpln": read_other(cls.read_zpln),
         }
 
         if not Path(path).exists():
@@ -864,6 +1135,14 @@ class Notebook:
 
         raise ValueError("Could not determine the notebook type")
 
+    def _crop(self, selector: Any) -> Notebook:
+        """
+        Deletes the cells that do not match the selector (in place)
+        """
+        if selector is not None:
+            self.select(selector).keep()
+        return self
+
     # == NotebookMetadata ==
     def add_author(self, name: str, **kwargs) -> None:
         """
@@ -1130,6 +1409,35 @@ class Notebook:
         compiled_regex = _get_regex(text, case=case, regex=regex)
         return self.select("has_match", compiled_regex, output=output).list()
 
+    def search_many(
+        self,
+        patterns: Iterable[str],
+        case: bool = False,
+        output: bool | str = False,
+        regex: bool = False,
+    ) -> dict[str, list[int]]:
+        """
+        Return the numbers of the cells containing each pattern.
+        The patterns are combined in a single regex, so each cell is scanned once.
+
+        :param patterns: strings to find in the cells
+        :param case: True if the search is case-sensitive
+        :param output: True if you want the search in the output of the cell too,
+         "raw" to search the raw text of the outputs without rendering them
+        :param regex: True if the patterns are regular expressions
+        :return: a dict mapping each pattern to the numbers of the matching cells
+        """
+        patterns = list(dict.fromkeys(patterns))
+        flags = 0 if case else re.IGNORECASE
+        sources = patterns if regex else [re.escape(pattern) for pattern in patterns]
+        matcher = _MultiMatcher(sources, flags)
+
+        result: dict[str, list[int]] = {pattern: [] for pattern in patterns}
+        for cell in self.iter_cells():
+            for i in matcher.find(cell._get_search_target(output)):
+                result[patterns[i]].append(cell.num)
+        return result
+
     def replace(
         self,
         old: str,
@@ -1156,6 +1464,52 @@ class Notebook:
             if count is not None and n_cells >= count:
                 break
 
+    def replace_many(
+        self, mapping: dict[str, str], regex: bool = False, case: bool = True
+    ) -> None:
+        """
+        Apply several replacements to the selected cells, in a single pass per cell:
+        the replaced text is not searched again by the other patterns.
+
+        :param mapping: dict mapping each string to replace to its replacement
+        :param regex: True if the keys are regular expressions (the replacements
+         can then reference their groups). Otherwise, when several keys match
+         at the same position, the longest one is replaced.
+        :param case: True if the search is case-sensitive
+        """
+        if not mapping:
+            return
+
+        patterns = list(mapping)
+        if not regex:
+            patterns.sort(key=len, reverse=True)
+
+        flags = 0 if case else re.IGNORECASE
+        if regex:
+            regexes = [re.compile(pattern, flags) for pattern in patterns]
+
+            def replace(i: int, match: re.Match) -> str:
+                # the groups of the pattern are numbered differently in the
+                # combined regex: the replacement is expanded on its own match
+                own_match = match
+                if match.re is not regexes[i]:
+                    own_match = regexes[i].match(match.string, match.start())
+                return own_match.expand(mapping[patterns[i]])
+
+            matcher = _MultiMatcher(patterns, flags)
+        else:
+            replacements = [mapping[pattern] for pattern in patterns]
+
+            def replace(i: int, match: re.Match) -> str:
+                return replacements[i]
+
+            matcher = _MultiMatcher([re.escape(p) for p in patterns], flags)
+
+        for cell in self.iter_cells():
+            source, n_replaced = matcher.subn(replace, cell.get_source())
+            if n_replaced:
+                cell.source = source
+
 
 # Helpers
 def _get_pygments_lexer(nb: Notebook, use_pygments: bool):
@@ -1191,6 +1545,146 @@ def _get_pygments_lexer(nb: Notebook, use_pygments: bool):
         return None
 
 
+def _split_pushdown(selector: Any) -> tuple[SelectorBase | None, SelectorBase | None]:
+    """
+    Splits a selector into a structural part, evaluated on the unparsed cells,
+    and the remaining part, evaluated once the matching cells are parsed.
+    """
+    from nbmanips.selector.default_selector import DefaultSelector
+
+    if selector is None:
+        return None, None
+
+    selector = Selector(selector)
+    if selector.structural:
+        return selector, None
+
+    def is_positionless(sel: SelectorBase) -> bool:
+        # the remaining selector is evaluated on the cropped notebook,
+        # where the selectors depending on the other cells (e.g. sections) are wrong
+        if isinstance(sel, ListSelector):
+            return all(is_positionless(child) for child in sel._list)
+        if isinstance(sel, DefaultSelector):
+            return not sel.positional
+        return isinstance(sel, TrueSelector)
+
+    if isinstance(selector, ListSelector) and selector._and and not selector._neg:
+        structural = [sel for sel in selector._list if sel.structural]
+        remaining = [sel for sel in selector._list if not sel.structural]
+        if structural and all(is_positionless(sel) for sel in remaining):
+            return reduce(and_, structural), reduce(and_, remaining)
+
+    return None, selector
+
+
+class _MultiMatcher:
+    """
+    Finds which of several regexes match a text, with a single combined regex.
+    The regexes that cannot be combined (backreferences, named groups,
+    global inline flags) are scanned on their own.
+    """
+
+    def __init__(self, sources: list[str], flags: int = 0):
+        self._sources = sources
+        self._flags = flags
+        self._compiled = [re.compile(source, flags) for source in sources]
+        self._regexes: dict[frozenset[int], re.Pattern] = {}
+
+        combinable = frozenset(
+            i for i, regex in enumerate(self._compiled) if _is_combinable(regex)
+        )
+        try:
+            self._get_regex(combinable)
+        except re.error:
+            combinable = frozenset()
+        self._combinable = combinable
+        self._separate = [i for i in range(len(sources)) if i not in combinable]
+
+    def _get_regex(self, indices: frozenset[int]) -> re.Pattern:
+        regex = self._regexes.get(indices)
+        if regex is None:
+            alternatives = (f"(?P<p{i}>{self._sources[i]})" for i in sorted(indices))
+            regex = self._regexes[indices] = re.compile(
+                "|".join(alternatives), self._flags
+            )
+        return regex
+
+    def find(self, text: str) -> set[int]:
+        """
+        :return: the indices of the regexes found in the text
+        """
+        found = {i for i in self._separate if self._compiled[i].search(text)}
+        remaining = self._combinable
+
+        # the matches do not overlap: the text is scanned again without the regexes
+        # already found, in case they hid other ones. Most texts are scanned once.
+        while remaining:
+            matches = self._get_regex(remaining).finditer(text)
+            new = {int(match.lastgroup[1:]) for match in matches}
+            if not new:
+                break
+            found |= new
+            remaining -= new
+        return found
+
+    def subn(
+        self, replace: Callable[[int, re.Match], str], text: str
+    ) -> tuple[str, int]:
+        """
+        Replaces the matches of all the regexes in a single pass
+
+        :param replace: function returning the replacement of a match,
+         given the index of the regex that matched
+        :return: the new text and the number of replacements
+        """
+        if not self._separate:
+            regex = self._get_regex(self._combinable)
+            return regex.subn(
+                lambda match: replace(int(match.lastgroup[1:]), match), text
+            )
+
+        # same matches as the combined regex: the leftmost one,
+        # and the first regex when several ones start at the same position
+        parts: list[str] = []
+        next_matches: dict[int, re.Match | None] = {}
+        position, n_replaced = 0, 0
+        while position <= len(text):
+            for i, regex in enumerate(self._compiled):
+                match = next_matches.get(i, False)
+                if match is False or (match is not None and match.start() < position):
+                    next_matches[i] = regex.search(text, position)
+
+            found = [(m.start(), i) for i, m in next_matches.items() if m is not None]
+            if not found:
+                break
+            _, i = min(found)
+            match = next_matches[i]
+            parts.append(text[position : match.start()])
+            parts.append(replace(i, match))
+            n_replaced += 1
+            position = match.end()
+            if match.end() == match.start():
+                # empty matches: the next one is searched after the next character
+                parts.append(text[position : position + 1])
+                position += 1
+        parts.append(text[position:])
+        return "".join(parts), n_replaced
+
+
+# backreferences (`\1`, `(?P=name)`, `(?(1)...)`) and global inline flags (`(?i)`)
+_UNCOMBINABLE_REGEX = re.compile(r"\\[1-9]|\(\?P=|\(\?\(|\(\?[aiLmsux]+\)")
+
+
+def _is_combinable(regex: re.Pattern) -> bool:
+    """
+    The regexes whose groups are referenced, or setting global flags, are changed
+    by being wrapped in the named group of a combined regex.
+    """
+    if regex.groupindex:
+        return False
+    return _UNCOMBINABLE_REGEX.search(regex.pattern) is None
+
+
 def _get_regex(text: str, case: bool = False, regex: bool = False) -> re.Pattern:
     if not regex:
         text = re.escape(text)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable
+from weakref import WeakKeyDictionary, WeakValueDictionary
+
+if TYPE_CHECKING:
+    from nbmanips.notebook import RawNotebookType
+    from nbmanips.notebook.sections import Section
+    from nbmanips.selector import SelectorBase
+
+
+class Revision:
+    """
+    Version counter of a raw notebook, bumped by the mutating APIs.
+    The caches attached to it are dropped on every mutation, and are also
+    checked against the edits made without the API (see `get_fingerprint`).
+    """
+
+    __slots__ = (
+        "raw_nb",
+        "version",
+        "selections",
+        "sections",
+        "texts",
+        "__weakref__",
+    )
+
+    def __init__(self, raw_nb: RawNotebookType):
+        self.raw_nb = raw_nb
+        self.version = 0
+        self.selections: WeakKeyDictionary[
+            SelectorBase, dict[bool, Any]
+        ] = WeakKeyDictionary()
+        self.sections: tuple[list, list[tuple], list[Section]] | None = None
+        self.texts: dict[str, dict[int, tuple[Any, list | None, Any]]] = {}
+
+    def bump(self) -> None:
+        self.version += 1
+        self.selections.clear()
+        self.sections = None
+        self.texts.clear()
+
+    def get_text(self, name: str, key: Any, compute: Callable[[], Any]) -> Any:
+        """
+        Returns a text computed from a part of a cell (e.g. its joined source,
+        or the symbols of its code), cached until the next mutation.
+
+        :param name: name of the text
+        :param key: object the text is computed from (e.g. the source of the cell).
+         Replacing it (even without the Notebook API) invalidates the text. If it is
+         a list (e.g. the outputs of the cell), replacing, adding or removing its
+         items does too, but modifying the items in place does not.
+        :param compute: function computing the text
+        """
+        texts = self.texts.get(name)
+        if texts is None:
+            texts = self.texts[name] = {}
+
+        # the key is stored along with the text, so that its id cannot be reused.
+        # The items of the lists are compared by identity first
+        entry = texts.get(id(key))
+        if (
+            entry is not None
+            and entry[0] is key
+            and (entry[1] is None or entry[1] == key)
+        ):
+            return entry[2]
+
+        text = compute()
+        texts[id(key)] = (key, list(key) if isinstance(key, list) else None, text)
+        return text
+
+
+def get_fingerprint(cells: list[dict[str, Any]]) -> list[tuple]:
+    """
+    Snapshot of the cells, compared to detect the edits made without the
+    Notebook/Cell API. The cells and their types, sources, outputs and metadata
+    are compared by identity (then equality) and by length: replacing them, or
+    adding and removing items, is detected. Modifying them in place without
+    changing their length (e.g. `cell.metadata["tags"][0] = "x"`) is not.
+    """
+    fingerprint = []
+    append = fingerprint.append
+    for cell in cells:
+        source = cell.get("source", "")
+        outputs, metadata = cell.get("outputs", ()), cell.get("metadata", ())
+        append(
+            (
+                cell,
+                cell.get("cell_type"),
+                source,
+                len(source),
+                outputs,
+                len(outputs),
+                metadata,
+                len(metadata),
+            )
+        )
+    return fingerprint
+
+
+# raw notebooks are plain dicts: the revisions are looked up by id.
+# A revision keeps its notebook alive, so the id cannot be reused meanwhile.
+_revisions: WeakValueDictionary[int, Revision] = WeakValueDictionary()
+
+
+def get_revision(raw_nb: RawNotebookType) -> Revision:
+    revision = _revisions.get(id(raw_nb))
+    if revision is None or revision.raw_nb is not raw_nb:
+        revision = _revisions[id(raw_nb)] = Revision(raw_nb)
+    return revision
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, NamedTuple
+
+from nbmanips.notebook.revision import get_fingerprint, get_revision
+
+if TYPE_CHECKING:
+    from nbmanips.notebook import RawNotebookType
+
+# markdown cells that cannot contain a heading are not rendered
+_HEADING_HINT = re.compile(r"#|<h[1-6]|^\s*(=+|-+)\s*$", re.MULTILINE | re.IGNORECASE)
+
+
+class Section(NamedTuple):
+    """
+    Section of a notebook: the cells from a heading (included) to the next
+    heading of the same or a higher level (excluded).
+    """
+
+    level: int
+    title: str
+    start: int
+    end: int
+
+
+def get_sections(nb: RawNotebookType) -> list[Section]:
+    """
+    Returns the sections of the notebook, ordered by their first cell.
+    The index is cached until the notebook is modified, including most of the
+    edits made without the Notebook/Cell API (see `get_fingerprint`).
+
+    :param nb: raw notebook
+    :return: a list of sections
+    """
+    revision = get_revision(nb)
+    cells = nb.get("cells", [])
+    fingerprint = get_fingerprint(cells)
+    cached = revision.sections
+    if cached is None or cached[0] is not cells or cached[1] != fingerprint:
+        cached = revision.sections = (cells, fingerprint, build_sections(nb))
+    return cached[2]
+
+
+def build_sections(nb: RawNotebookType) -> list[Section]:
+    from nbmanips.cell import Cell
+
+    headings: list[tuple[int, str, int]] = []
+    for num, content in enumerate(nb.get("cells", [])):
+        if content.get("cell_type") != "markdown":
+            continue
+
+        cell = Cell(content, num)
+        if not _HEADING_HINT.search(cell.source):
+            continue
+
+        for element in cell.soup.select("h1, h2, h3, h4, h5, h6"):
+            headings.append((int(element.name[-1]), element.text.strip(), num))
+
+    # a section ends where the next section of the same or a higher level starts.
+    # The open sections of different cells have increasing levels: at most 6 of them
+    n_cells = len(nb.get("cells", []))
+    ends = [n_cells] * len(headings)
+    open_sections: list[int] = []
+    for i, (level, _, num) in enumerate(headings):
+        remaining = []
+        for j in open_sections:
+            if headings[j][0] >= level and headings[j][2] < num:
+                ends[j] = num
+            else:
+                remaining.append(j)
+        open_sections = [*remaining, i]
+
+    return [
+        Section(level, title, num, end)
+        for (level, title, num), end in zip(headings, ends)
+    ]
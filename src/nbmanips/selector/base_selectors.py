@@ -2,30 +2,111 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from copy import copy
-from functools import partial
-from itertools import filterfalse
-from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from nbmanips.cell import Cell
 
 if TYPE_CHECKING:
     from nbmanips.notebook import RawNotebookType
 
+# Ascending cell numbers to visit (None: all the cells) and the predicate to apply
+# to them (None: every candidate is selected)
+PlanType = Tuple[Optional[Sequence[int]], Optional[Callable[[Cell], bool]]]
+
+# Cost hints used to evaluate the cheapest selectors first
+LOW_COST = 1
+DEFAULT_COST = 10
+HIGH_COST = 100
+
 
 class SelectorBase(ABC):
     def __init__(self):
         self._neg = False
 
+    @property
+    def cost(self) -> float:
+        """Estimated cost of evaluating the selector on a single cell"""
+        return DEFAULT_COST
+
+    @property
+    def structural(self) -> bool:
+        """
+        True if the selector only reads the cell types, metadata and positions.
+        Structural selectors can be evaluated on unparsed cells when reading notebooks.
+        """
+        return False
+
     @abstractmethod
     def get_callable(self, nb: RawNotebookType) -> Callable[[Cell], bool]:
         pass
 
-    def iter_cells(self, nb: RawNotebookType, neg: bool = False) -> Iterator[Cell]:
-        selector = self.get_callable(nb)
-        filter_method = filterfalse if (self._neg ^ neg) else filter
-        return filter_method(
-            selector, (Cell(cell, i) for i, cell in enumerate(nb["cells"]))
-        )
+    def compile(self, nb: RawNotebookType) -> Callable[[Cell], bool]:
+        """
+        Returns a single predicate evaluating the whole selector (negation included).
+        It should be called once per evaluation of the selector on a notebook.
+
+        :param nb: raw notebook on which the selector will be evaluated
+        :return: a predicate on cells
+        """
+        return self._compile(nb, self._neg)
+
+    def _compile(self, nb: RawNotebookType, neg: bool) -> Callable[[Cell], bool]:
+        predicate = self.get_callable(nb)
+        return _negate(predicate) if neg else predicate
+
+    def _plan(self, nb: RawNotebookType, neg: bool) -> PlanType:
+        """
+        Returns the candidate cell numbers the selector can be narrowed down to
+        without scanning the notebook, along with the predicate left to evaluate.
+
+        :param nb: raw notebook on which the selector will be evaluated
+        :param neg: True if the selector is negated
+        :return: the candidates and the remaining predicate
+        """
+        return None, self._compile(nb, neg)
+
+    def _plan_within(
+        self, nb: RawNotebookType, neg: bool, candidates: Sequence[int] | None
+    ) -> PlanType:
+        """
+        Same as `_plan`, knowing the candidates the other selectors of an "and"
+        already narrowed the selection down to. Selectors scanning the notebook
+        can restrict their work to these cells.
+
+        :param nb: raw notebook on which the selector will be evaluated
+        :param neg: True if the selector is negated
+        :param candidates: candidate cell numbers (None: all the cells)
+        :return: the candidates (among the given ones) and the remaining predicate
+        """
+        return _restrict(self._plan(nb, neg), candidates)
+
+    def iter_cells(
+        self, nb: RawNotebookType, neg: bool = False, reverse: bool = False
+    ) -> Iterator[Cell]:
+        from nbmanips.notebook.revision import get_revision
+
+        candidates, predicate = self._plan(nb, self._neg ^ neg)
+        cells = nb["cells"]
+        if candidates is None:
+            candidates = range(len(cells))
+        if reverse:
+            candidates = reversed(candidates)
+
+        # the cells share the caches of the notebook
+        revision = get_revision(nb)
+        iterator = (Cell(cells[i], i, revision) for i in candidates)
+
+        if predicate is None:
+            return iterator
+        return filter(predicate, iterator)
 
     def __invert__(self):
         selector = copy(self)
@@ -52,14 +133,18 @@ class SelectorBase(ABC):
 
 
 class TrueSelector(SelectorBase):
-    def iter_cells(self, nb: RawNotebookType, neg: bool = False) -> Iterator[Cell]:
-        if self._neg ^ neg:
-            return (_ for _ in range(0))
-        return (Cell(cell, i) for i, cell in enumerate(nb["cells"]))
+    cost = LOW_COST
+    structural = True
+
+    def _plan(self, nb: RawNotebookType, neg: bool) -> PlanType:
+        return ([] if neg else None), None
 
     def get_callable(self, nb: RawNotebookType) -> Callable[[Cell], bool]:
         return lambda cell: True
 
+    def _compile(self, nb: RawNotebookType, neg: bool) -> Callable[[Cell], bool]:
+        return (lambda cell: False) if neg else (lambda cell: True)
+
     def __and__(self, other: SelectorBase) -> SelectorBase:
         if not isinstance(other, SelectorBase):
             return NotImplemented
@@ -128,14 +213,67 @@ class ListSelector(SelectorBase):
             selector._list.append(other)
         return selector
 
-    def get_callable(self, nb: RawNotebookType) -> Callable[[Cell], bool]:
-        op = all if self._and else any
-        return partial(self.__combine, op=op, nb=nb)
+    @property
+    def cost(self) -> float:
+        return sum(sel.cost for sel in self._list)
 
-    def __combine(
-        self, cell: Cell, op: Callable[[Iterable[bool]], bool], nb: RawNotebookType
-    ) -> bool:
-        return op((sel._neg ^ sel.get_callable(nb)(cell)) for sel in self._list)
+    @property
+    def structural(self) -> bool:
+        return all(sel.structural for sel in self._list)
+
+    def get_callable(self, nb: RawNotebookType) -> Callable[[Cell], bool]:
+        return self._compile(nb, False)
+
+    def _compile(self, nb: RawNotebookType, neg: bool) -> Callable[[Cell], bool]:
+        is_and, selectors = self._flatten(neg)
+        # cheapest first: the combination short-circuits on the first decisive result
+        selectors.sort(key=lambda item: item[0].cost)
+        predicates = [sel._compile(nb, sel_neg) for sel, sel_neg in selectors]
+        return _combine(predicates, is_and)
+
+    def _plan(self, nb: RawNotebookType, neg: bool) -> PlanType:
+        is_and, selectors = self._flatten(neg)
+        if not is_and:
+            plans = [sel._plan(nb, sel_neg) for sel, sel_neg in selectors]
+            exact = all(predicate is None for _, predicate in plans)
+            if exact and all(candidates is not None for candidates, _ in plans):
+                union = set().union(*(candidates for candidates, _ in plans))
+                return sorted(union), None
+            return None, self._compile(nb, neg)
+
+        # cheapest first: the candidates of the cheap selectors (e.g. positions)
+        # narrow down the cells the next ones need to look at
+        selectors.sort(key=lambda item: item[0].cost)
+        candidates = None
+        predicates = []
+        for sel, sel_neg in selectors:
+            sel_candidates, predicate = sel._plan_within(nb, sel_neg, candidates)
+            if sel_candidates is not None:
+                candidates = sel_candidates
+            if predicate is not None:
+                predicates.append(predicate)
+
+        if not predicates:
+            return candidates, None
+        return candidates, _combine(predicates, True)
+
+    def _flatten(self, neg: bool) -> tuple[bool, list[tuple[SelectorBase, bool]]]:
+        """
+        Folds the negation into the sub-selectors (De Morgan's laws) and inlines the
+        nested list selectors combined with the same operator.
+
+        :param neg: True if the selector is negated
+        :return: the operator (True for "and") and the (selector, negation) pairs
+        """
+        is_and = self._and ^ neg
+        selectors = []
+        for sel in self._list:
+            sel_neg = sel._neg ^ neg
+            if isinstance(sel, ListSelector) and (sel._and ^ sel_neg) == is_and:
+                selectors.extend(sel._flatten(sel_neg)[1])
+            else:
+                selectors.append((sel, sel_neg))
+        return is_and, selectors
 
     @staticmethod
     def _check_sanity(kwargs: dict[str, str]) -> bool:
@@ -171,3 +309,45 @@ class ListSelector(SelectorBase):
             else:
                 raise ValueError("Cannot parse arguments:", str(arg))
         return args_list, kwargs_list
+
+
+def _intersect(candidates_list: list[Sequence[int]]) -> Sequence[int] | None:
+    if not candidates_list:
+        return None
+
+    smallest, *others = sorted(candidates_list, key=len)
+    others = [c if isinstance(c, (range, set)) else set(c) for c in others]
+    return [i for i in smallest if all(i in c for c in others)]
+
+
+def _restrict(plan: PlanType, candidates: Sequence[int] | None) -> PlanType:
+    plan_candidates, predicate = plan
+    if candidates is None:
+        return plan
+    if plan_candidates is None:
+        return candidates, predicate
+    return _intersect([candidates, plan_candidates]), predicate
+
+
+def _negate(predicate: Callable[[Cell], bool]) -> Callable[[Cell], bool]:
+    return lambda cell: not predicate(cell)
+
+
+def _combine(
+    predicates: list[Callable[[Cell], bool]], is_and: bool
+) -> Callable[[Cell], bool]:
+    if not predicates:
+        return (lambda cell: True) if is_and else (lambda cell: False)
+
+    if len(predicates) == 1:
+        return predicates[0]
+
+    if len(predicates) == 2:  # noqa: PLR2004
+        first, second = predicates
+        if is_and:
+            return lambda cell: bool(first(cell) and second(cell))
+        return lambda cell: bool(first(cell) or second(cell))
+
+    if is_and:
+        return lambda cell: all(predicate(cell) for predicate in predicates)
+    return lambda cell: any(predicate(cell) for predicate in predicates)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from nbmanips.cell import Cell
+from nbmanips.selector.base_selectors import PlanType, SelectorBase
+
+
+class ContextSelector(SelectorBase):
+    """
+    Selects the cells matching a selector along with the cells around them,
+    like `grep --context`.
+    """
+
+    def __init__(self, selector: SelectorBase, before: int = 0, after: int = 0):
+        """
+        :param selector: selector of the matching cells
+        :param before: number of cells to select before each match
+        :param after: number of cells to select after each match
+        """
+        if before < 0 or after < 0:
+            raise ValueError("The context sizes need to be positive")
+
+        self._selector = selector
+        self._before = before
+        self._after = after
+        super().__init__()
+
+    @property
+    def cost(self) -> float:
+        return self._selector.cost
+
+    @property
+    def structural(self) -> bool:
+        return self._selector.structural
+
+    def get_callable(self, nb: dict) -> Callable[[Cell], bool]:
+        indices = set(self._get_indices(nb))
+        return lambda cell: cell.num in indices
+
+    def _plan(self, nb: dict, neg: bool) -> PlanType:
+        indices = self._get_indices(nb)
+        if neg:
+            excluded = set(indices)
+            indices = [i for i in range(len(nb["cells"])) if i not in excluded]
+        return indices, None
+
+    def _get_indices(self, nb: dict) -> list[int]:
+        n_cells = len(nb["cells"])
+        before, after = self._before, self._after
+
+        # the matches are visited in ascending order: the ranges only need to be
+        # merged with the previous one
+        indices: list[int] = []
+        end = 0
+        for cell in self._selector.iter_cells(nb):
+            start = max(cell.num - before, end)
+            end = max(min(cell.num + after + 1, n_cells), end)
+            indices.extend(range(start, end))
+        return indices
@@ -1,23 +1,188 @@
 from __future__ import annotations
 
 import re
-from typing import Callable, ClassVar, Iterable, Literal
-
-from nbmanips.cell import Cell, MarkdownCell
+from bisect import bisect_right
+from functools import partial
+from inspect import signature
+from itertools import chain, compress
+from operator import not_
+from typing import Any, Callable, ClassVar, Iterable, Literal, Sequence, Union
+
+from nbmanips.cell import Cell, CellOutput, CodeCell, MarkdownCell
+from nbmanips.selector.base_selectors import (
+    DEFAULT_COST,
+    HIGH_COST,
+    LOW_COST,
+    PlanType,
+    _restrict,
+)
 from nbmanips.selector.callable_selector import CallableSelector
 
+CostType = Union[float, Callable[..., float]]
+BatchType = Callable[..., list]
+RangesType = Callable[..., list]
+RawCellType = dict[str, Any]
+
 
 class DefaultSelector(CallableSelector):
     default_selectors: ClassVar[dict[str, Callable]] = {}
+    default_costs: ClassVar[dict[str, CostType]] = {}
+    default_batches: ClassVar[dict[str, BatchType]] = {}
+    default_ranges: ClassVar[dict[str, RangesType]] = {}
+    structural_selectors: ClassVar[set[str]] = set()
+    notebook_batches: ClassVar[set[str]] = set()
+    positional_selectors: ClassVar[set[str]] = set()
 
     def __init__(self, selector: str, *args, **kwargs):
         # TODO: use signature ?
         callable_selector = self.default_selectors[selector]
+        self._key = selector
+        self._args = args
+        self._kwargs = kwargs
         super().__init__(callable_selector, *args, **kwargs)
 
+    @property
+    def cost(self) -> float:
+        cost = self.default_costs.get(self._key, DEFAULT_COST)
+        if not callable(cost):
+            return cost
+
+        selector = self.default_selectors[self._key]
+        arguments = signature(selector).bind(None, *self._args, **self._kwargs)
+        arguments.apply_defaults()
+        _, *params = arguments.arguments.items()
+        return cost(**dict(params))
+
+    @property
+    def structural(self) -> bool:
+        return self._key in self.structural_selectors
+
+    @property
+    def positional(self) -> bool:
+        return self._key in self.positional_selectors
+
+    def get_callable(self, nb: dict) -> Callable[[Cell], bool]:
+        ranges = self._get_ranges(nb)
+        if ranges is not None:
+            starts = [r.start for r in ranges]
+            return lambda cell: _in_ranges(cell.num, starts, ranges)
+
+        if not self._is_batched:
+            return super().get_callable(nb)
+        mask = self._get_mask(nb)
+        return lambda cell: mask[cell.num]
+
+    def _plan(self, nb: dict, neg: bool) -> PlanType:
+        return self._plan_within(nb, neg, None)
+
+    def _plan_within(
+        self, nb: dict, neg: bool, candidates: Sequence[int] | None
+    ) -> PlanType:
+        ranges = self._get_ranges(nb)
+        if ranges is not None:
+            if neg:
+                ranges = _complement(ranges, len(nb["cells"]))
+            selected = ranges[0] if len(ranges) == 1 else _chain_ranges(ranges)
+            return _restrict((selected, None), candidates)
+
+        # the expensive selectors (e.g. rendering the outputs) are evaluated lazily,
+        # so that iterations stopping early do not pay for the whole notebook
+        if not self._is_batched:
+            return _restrict(super()._plan(nb, neg), candidates)
+
+        # only the candidates of the other selectors are evaluated
+        mask = self._get_mask(nb, candidates)
+        if neg:
+            mask = map(not_, mask)
+        indices = range(len(nb["cells"])) if candidates is None else candidates
+        return list(compress(indices, mask)), None
+
+    @property
+    def _is_batched(self) -> bool:
+        return self._key in self.default_batches and self.cost < HIGH_COST
+
+    def _get_ranges(self, nb: dict) -> list[range] | None:
+        get_ranges = self.default_ranges.get(self._key)
+        if get_ranges is None:
+            return None
+        return get_ranges(nb, *self._args, **self._kwargs)
+
+    def _get_mask(self, nb: dict, candidates: Sequence[int] | None = None) -> list:
+        batch = self.default_batches[self._key]
+        cells = nb["cells"]
+        if candidates is not None:
+            cells = [cells[i] for i in candidates]
+        if self._key in self.notebook_batches:
+            return batch(nb, cells, *self._args, **self._kwargs)
+        return batch(cells, *self._args, **self._kwargs)
+
     @classmethod
-    def register_selector(cls, key: str, selector: Callable[..., bool]) -> None:
+    def register_selector(
+        cls,
+        key: str,
+        selector: Callable[..., bool],
+        cost: CostType | None = None,
+        batch: BatchType | None = None,
+        structural: bool = False,
+        notebook_batch: bool = False,
+        ranges: RangesType | None = None,
+        positional: bool = False,
+    ) -> None:
+        """
+        Registers a selector that can be referenced by its key
+
+        :param key: name of the selector
+        :param selector: function taking a cell and the selector arguments
+        :param cost: estimated cost of evaluating the selector on a cell, used to
+         evaluate cheap selectors first. It can also be a function taking the
+         selector arguments (as keywords) and returning the cost.
+        :param batch: vectorized version of the selector: a function taking a list
+         of raw cells and the selector arguments, and returning a list of booleans.
+         It is only used by selectors cheaper than HIGH_COST: the expensive ones are
+         evaluated lazily, cell by cell.
+        :param structural: True if the selector only reads the cell type and metadata
+        :param notebook_batch: True if the batch function also takes the raw notebook
+         as first argument (e.g. to use the caches of the notebook)
+        :param ranges: function taking the raw notebook and the selector arguments,
+         and returning the sorted and disjoint ranges of selected cells
+         (e.g. looked up in an index of the notebook)
+        :param positional: True if the selection of a cell depends on the other cells
+         of the notebook (e.g. the section it belongs to)
+        """
         cls.default_selectors[key] = selector
+        for flags, value in (
+            (cls.structural_selectors, structural),
+            (cls.notebook_batches, notebook_batch),
+            (cls.positional_selectors, positional),
+        ):
+            if value:
+                flags.add(key)
+            else:
+                flags.discard(key)
+        for registry, value in (
+            (cls.default_costs, cost),
+            (cls.default_batches, batch),
+            (cls.default_ranges, ranges),
+        ):
+            if value is None:
+                registry.pop(key, None)
+            else:
+                registry[key] = value
+
+
+def _in_ranges(num: int, starts: list[int], ranges: list[range]) -> bool:
+    i = bisect_right(starts, num) - 1
+    return i >= 0 and num < ranges[i].stop
+
+
+def _chain_ranges(ranges: list[range]) -> list[int]:
+    return list(chain.from_iterable(ranges))
+
+
+def _complement(ranges: list[range], n_cells: int) -> list[range]:
+    stops = [0, *(r.stop for r in ranges)]
+    starts = [*(r.start for r in ranges), n_cells]
+    return [range(stop, start) for stop, start in zip(stops, starts) if stop < start]
 
 
 # -- Default Selectors --
@@ -25,7 +190,7 @@ def contains(
     cell: Cell,
     text: str,
     case: bool = True,
-    output: bool = False,
+    output: bool | str = False,
     regex: bool = False,
     flags: int = 0,
 ) -> bool:
@@ -36,7 +201,8 @@ def contains(
     :param text: a string to find in cell
     :param case: True if the search is case sensitive
     :type case: default True
-    :param output: True if you want the search in the output of the cell too
+    :param output: True if you want the search in the output of the cell too,
+     "raw" to search the raw text of the outputs without rendering them
     :type output: default False
     :param regex: boolean whether to use regex or not
     :param flags: flags used if regex is set to True
@@ -46,7 +212,7 @@ def contains(
     return cell.contains(text, case=case, output=output, regex=regex, flags=flags)
 
 
-def has_match(cell: Cell, regex: str | re.Pattern, output: bool = False) -> bool:
+def has_match(cell: Cell, regex: str | re.Pattern, output: bool | str = False) -> bool:
     """
     Selects Cells that match a certain regex.
 
@@ -54,7 +220,8 @@ def has_match(cell: Cell, regex: str | re.Pattern, output: bool = False) -> bool
     :param text: a string to find in cell
     :param case: True if the search is case sensitive
     :type case: default True
-    :param output: True if you want the search in the output of the cell too
+    :param output: True if you want the search in the output of the cell too,
+     "raw" to search the raw text of the outputs without rendering them
     :type output: default False
     :param regex: boolean whether to use regex or not
     :return: a bool object (True if cell should be selected)
@@ -115,7 +282,7 @@ def has_output(cell: Cell, value: bool = True) -> bool:
     :param value: set to False if you want to select cells with no output
     :return: a bool object (True if cell should be selected)
     """
-    return (cell.output != "") is value
+    return cell.has_output() is value
 
 
 def has_output_type(cell: Cell, output_type: Iterable[str] | str) -> bool:
@@ -240,31 +407,284 @@ def is_new_slide(cell: Cell, subslide: bool = True) -> bool:
     return has_slide_type(cell, slide_types)
 
 
+def has_identifier(cell: CodeCell, name: str) -> bool:
+    """
+    Selects code cells using an identifier (comments and strings are ignored)
+
+    :param cell: Cell object to select
+    :param name: name of a variable, function, attribute, module...
+    :return: a bool object (True if cell should be selected)
+    """
+    return is_code(cell) and name in cell.symbols.identifiers
+
+
+def calls(cell: CodeCell, name: str) -> bool:
+    """
+    Selects code cells calling a function
+
+    :param cell: Cell object to select
+    :param name: name of the function (`fit`) or dotted path (`model.fit`)
+    :return: a bool object (True if cell should be selected)
+    """
+    return is_code(cell) and name in cell.symbols.calls
+
+
+def imports(cell: CodeCell, module: str) -> bool:
+    """
+    Selects code cells importing a module (or a name from a module)
+
+    :param cell: Cell object to select
+    :param module: dotted name of the module (`sklearn` matches `sklearn.svm`)
+    :return: a bool object (True if cell should be selected)
+    """
+    return is_code(cell) and module in cell.symbols.imports
+
+
+def defines(cell: CodeCell, name: str) -> bool:
+    """
+    Selects code cells defining a function, a class or a variable
+
+    :param cell: Cell object to select
+    :param name: name of the definition
+    :return: a bool object (True if cell should be selected)
+    """
+    return is_code(cell) and name in cell.symbols.defines
+
+
+def in_section(
+    cell: Cell, title: str | re.Pattern, level: int | None = None, regex: bool = False
+) -> bool:
+    """
+    Selects the cells under a given heading (heading included)
+
+    :param cell: Cell object to select
+    :param title: title of the section (case-insensitive) or a regex pattern
+    :param level: level of the heading (1 for "#", 2 for "##", ...), any level if None
+    :param regex: True if title is a regular expression
+    :return: a bool object (True if cell should be selected)
+    """
+    raise ValueError("in_section needs the whole notebook to select cells")
+
+
+# -- Batch Selectors --
+def _get_source(cell: RawCellType) -> str:
+    source = cell["source"]
+    if not isinstance(source, str):
+        source = "".join(source)
+    return source.strip()
+
+
+def _contains_batch(
+    nb: dict,
+    cells: list[RawCellType],
+    text: str,
+    case: bool = True,
+    output: bool | str = False,
+    regex: bool = False,
+    flags: int = 0,
+) -> list[bool]:
+    from nbmanips.notebook.revision import get_revision
+
+    # the search texts are cached on the notebook until it is modified
+    revision = get_revision(nb)
+    if output:
+        targets = [
+            Cell(cell, revision=revision)._get_search_target(output) for cell in cells
+        ]
+    else:
+        get_text = revision.get_text
+        targets = [
+            get_text("source", cell["source"], partial(_get_source, cell))
+            for cell in cells
+        ]
+
+    if regex:
+        flags = flags & ~re.IGNORECASE if case else flags | re.IGNORECASE
+        search = re.compile(text, flags=flags).search
+        return [search(target) is not None for target in targets]
+
+    if case:
+        return [text in target for target in targets]
+
+    text = text.lower()
+    return [text in target.lower() for target in targets]
+
+
+def _has_type_batch(cells: list[RawCellType], type_: str) -> list[bool]:
+    return [cell["cell_type"] == type_ for cell in cells]
+
+
+def _has_output_batch(cells: list[RawCellType], value: bool = True) -> list[bool]:
+    return [
+        any(not CellOutput(output).is_empty() for output in cell.get("outputs", ()))
+        is value
+        for cell in cells
+    ]
+
+
+def _is_empty_batch(cells: list[RawCellType]) -> list[bool]:
+    return [
+        has_no_output and _get_source(cell) == ""
+        for cell, has_no_output in zip(cells, _has_output_batch(cells, False))
+    ]
+
+
+_is_code_batch = partial(_has_type_batch, type_="code")
+_is_markdown_batch = partial(_has_type_batch, type_="markdown")
+_is_raw_batch = partial(_has_type_batch, type_="raw")
+
+
+def _has_output_type_batch(
+    cells: list[RawCellType], output_type: Iterable[str] | str
+) -> list[bool]:
+    output_types = {output_type} if isinstance(output_type, str) else set(output_type)
+    return [
+        any(
+            CellOutput(cell_output).has_output_type(output_types)
+            for cell_output in cell.get("outputs", ())
+        )
+        for cell in cells
+    ]
+
+
+def _has_slide_type_batch(
+    cells: list[RawCellType], slide_type: Iterable[str] | str
+) -> list[bool]:
+    slide_types = {slide_type} if isinstance(slide_type, str) else set(slide_type)
+    return [
+        cell["metadata"].get("slideshow", {}).get("slide_type") in slide_types
+        for cell in cells
+    ]
+
+
+def _is_new_slide_batch(cells: list[RawCellType], subslide: bool = True) -> list[bool]:
+    return _has_slide_type_batch(cells, {"slide", "subslide"} if subslide else "slide")
+
+
+def _has_tag_batch(
+    cells: list[RawCellType], tag: str, case: bool = False
+) -> list[bool]:
+    if case:
+        return [tag in cell["metadata"].get("tags", ()) for cell in cells]
+
+    tag = tag.lower()
+    return [
+        any(tag == cell_tag.lower() for cell_tag in cell["metadata"].get("tags", ()))
+        for cell in cells
+    ]
+
+
+def _in_section_ranges(
+    nb: dict,
+    title: str | re.Pattern,
+    level: int | str | None = None,
+    regex: bool = False,
+) -> list[range]:
+    from nbmanips.notebook.sections import get_sections
+
+    if isinstance(title, re.Pattern):
+        matches = title.search
+    elif regex:
+        matches = re.compile(title, re.IGNORECASE).search
+    else:
+        matches = re.compile(re.escape(title.strip()), re.IGNORECASE).fullmatch
+    level = None if level is None else int(level)
+    n_cells = len(nb["cells"])
+
+    # the sections are sorted by their first cell: the nested and adjacent
+    # sections are merged with the previous range
+    ranges: list[range] = []
+    for section in get_sections(nb):
+        if (level is not None and section.level != level) or not matches(section.title):
+            continue
+        start, end = min(section.start, n_cells), min(section.end, n_cells)
+        if ranges and start <= ranges[-1].stop:
+            last = ranges.pop()
+            ranges.append(range(last.start, max(last.stop, end)))
+        elif start < end:
+            ranges.append(range(start, end))
+    return ranges
+
+
+def _output_cost(output: bool | str = False, **kwargs) -> float:
+    return HIGH_COST if output is True else DEFAULT_COST
+
+
 # -- Default Selectors --
-DefaultSelector.register_selector("contains", contains)
-DefaultSelector.register_selector("has_match", has_match)
-DefaultSelector.register_selector("empty", is_empty)
-DefaultSelector.register_selector("is_empty", is_empty)
-DefaultSelector.register_selector("has_byte_size", has_byte_size)
-DefaultSelector.register_selector("has_tag", has_tag)
+DefaultSelector.register_selector(
+    "contains",
+    contains,
+    cost=_output_cost,
+    batch=_contains_batch,
+    notebook_batch=True,
+)
+DefaultSelector.register_selector("has_match", has_match, cost=_output_cost)
+DefaultSelector.register_selector("empty", is_empty, batch=_is_empty_batch)
+DefaultSelector.register_selector("is_empty", is_empty, batch=_is_empty_batch)
+DefaultSelector.register_selector("has_byte_size", has_byte_size, cost=HIGH_COST)
+DefaultSelector.register_selector(
+    "has_tag", has_tag, cost=LOW_COST, batch=_has_tag_batch, structural=True
+)
+
+DefaultSelector.register_selector(
+    "in_section", in_section, ranges=_in_section_ranges, positional=True
+)
 
 # -- Code Specific Selectors --
-DefaultSelector.register_selector("has_output", has_output)
-DefaultSelector.register_selector("has_output_type", has_output_type)
+DefaultSelector.register_selector("has_identifier", has_identifier, cost=HIGH_COST)
+DefaultSelector.register_selector("calls", calls, cost=HIGH_COST)
+DefaultSelector.register_selector("imports", imports, cost=HIGH_COST)
+DefaultSelector.register_selector("defines", defines, cost=HIGH_COST)
+DefaultSelector.register_selector("has_output", has_output, batch=_has_output_batch)
+DefaultSelector.register_selector(
+    "has_output_type", has_output_type, batch=_has_output_type_batch
+)
 
 # -- Markdown Specific Selectors --
-DefaultSelector.register_selector("has_html_tag", with_css_selector)
-DefaultSelector.register_selector("with_css_selector", with_css_selector)
+DefaultSelector.register_selector("has_html_tag", with_css_selector, cost=HIGH_COST)
+DefaultSelector.register_selector(
+    "with_css_selector", with_css_selector, cost=HIGH_COST
+)
 
 # -- Cell Types --
-DefaultSelector.register_selector("has_type", has_type)
-DefaultSelector.register_selector("raw_cells", is_raw)
-DefaultSelector.register_selector("is_raw", is_raw)
-DefaultSelector.register_selector("markdown_cells", is_markdown)
-DefaultSelector.register_selector("is_markdown", is_markdown)
-DefaultSelector.register_selector("code_cells", is_code)
-DefaultSelector.register_selector("is_code", is_code)
+DefaultSelector.register_selector(
+    "has_type", has_type, cost=LOW_COST, batch=_has_type_batch, structural=True
+)
+DefaultSelector.register_selector(
+    "raw_cells", is_raw, cost=LOW_COST, batch=_is_raw_batch, structural=True
+)
+DefaultSelector.register_selector(
+    "is_raw", is_raw, cost=LOW_COST, batch=_is_raw_batch, structural=True
+)
+DefaultSelector.register_selector(
+    "markdown_cells",
+    is_markdown,
+    cost=LOW_COST,
+    batch=_is_markdown_batch,
+    structural=True,
+)
+DefaultSelector.register_selector(
+    "is_markdown", is_markdown, cost=LOW_COST, batch=_is_markdown_batch, structural=True
+)
+DefaultSelector.register_selector(
+    "code_cells", is_code, cost=LOW_COST, batch=_is_code_batch, structural=True
+)
+DefaultSelector.register_selector(
+    "is_code", is_code, cost=LOW_COST, batch=_is_code_batch, structural=True
+)
 
 # -- Slide cells --
-DefaultSelector.register_selector("has_slide_type", has_slide_type)
-DefaultSelector.register_selector("is_new_slide", is_new_slide)
+DefaultSelector.register_selector(
+    "has_slide_type",
+    has_slide_type,
+    cost=LOW_COST,
+    batch=_has_slide_type_batch,
+    structural=True,
+)
+DefaultSelector.register_selector(
+    "is_new_slide",
+    is_new_slide,
+    cost=LOW_COST,
+    batch=_is_new_slide_batch,
+    structural=True,
+)
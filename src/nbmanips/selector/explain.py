@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from copy import copy
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, Sequence
+
+from nbmanips.cell import Cell
+from nbmanips.selector.base_selectors import (
+    ListSelector,
+    PlanType,
+    SelectorBase,
+    TrueSelector,
+)
+
+if TYPE_CHECKING:
+    from nbmanips.notebook import RawNotebookType
+
+
+class NodeStats:
+    """
+    Statistics of a node of the selector tree
+
+    - time: wall time spent evaluating the node (seconds)
+    - calls: number of calls to the node (per cell predicate or whole notebook plan)
+    - cells_in / cells_out: number of cells evaluated / selected by the node
+
+    Negations are pushed down to the leaves before the evaluation, so the counts of
+    a node under a negated list are the ones of the negated node.
+    """
+
+    __slots__ = ("label", "depth", "time", "calls", "cells_in", "cells_out", "leaf")
+
+    def __init__(self, label: str, depth: int, leaf: bool = True):
+        self.label = label
+        self.depth = depth
+        self.leaf = leaf
+        self.time = 0.0
+        self.calls = 0
+        self.cells_in = 0
+        self.cells_out = 0
+
+    @property
+    def selectivity(self) -> float | None:
+        if not self.cells_in:
+            return None
+        return self.cells_out / self.cells_in
+
+
+class Explanation:
+    def __init__(
+        self, nodes: list[NodeStats], time: float, selected: int, allocations: int
+    ):
+        self.nodes = nodes
+        self.time = time
+        self.selected = selected
+        self.allocations = allocations
+
+    def to_str(self) -> str:
+        width = max(len("node"), *(2 * n.depth + len(n.label) for n in self.nodes))
+        header = ["node", "time (ms)", "calls", "in", "out", "selectivity"]
+        lines = [
+            f"{header[0]:<{width}}  {header[1]:>10}  {header[2]:>8}  "
+            f"{header[3]:>8}  {header[4]:>8}  {header[5]:>11}"
+        ]
+        for node in self.nodes:
+            label = f"{'  ' * node.depth}{node.label}"
+            if not node.leaf:
+                lines.append(label)
+                continue
+
+            selectivity = node.selectivity
+            selectivity = "-" if selectivity is None else f"{selectivity:.1%}"
+            lines.append(
+                f"{label:<{width}}  {node.time * 1000:>10.2f}  {node.calls:>8}  "
+                f"{node.cells_in:>8}  {node.cells_out:>8}  {selectivity:>11}"
+            )
+
+        lines.append(
+            f"total: {self.time * 1000:.2f} ms, {self.selected} cells selected, "
+            f"{self.allocations} Cell allocations"
+        )
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.to_str()
+
+
+def explain(selector: SelectorBase, nb: RawNotebookType) -> Explanation:
+    """
+    Evaluates the selector on the notebook and profiles each node of the selector
+
+    :param selector: selector to evaluate
+    :param nb: raw notebook
+    :return: an Explanation object
+    """
+    nodes: list[NodeStats] = []
+    profiled = _profile(selector, 0, nodes)
+
+    start = perf_counter()
+    cells = nb["cells"]
+    candidates, predicate = profiled._plan(nb, profiled._neg)
+    if candidates is None:
+        candidates = range(len(cells))
+
+    selected = allocations = 0
+    for i in candidates:
+        cell = Cell(cells[i], i)
+        allocations += 1
+        if predicate is None or predicate(cell):
+            selected += 1
+
+    return Explanation(nodes, perf_counter() - start, selected, allocations)
+
+
+def _profile(selector: SelectorBase, depth: int, nodes: list[NodeStats]):
+    if isinstance(selector, ListSelector):
+        nodes.append(NodeStats(_label(selector), depth, leaf=False))
+        profiled = copy(selector)
+        profiled._list = [_profile(sel, depth + 1, nodes) for sel in selector._list]
+        return profiled
+
+    stats = NodeStats(_label(selector), depth)
+    nodes.append(stats)
+    return _ProfiledSelector(selector, stats)
+
+
+def _label(selector: SelectorBase) -> str:
+    from nbmanips.selector.callable_selector import CallableSelector
+    from nbmanips.selector.context_selector import ContextSelector
+    from nbmanips.selector.default_selector import DefaultSelector
+    from nbmanips.selector.index_selector import IndexSelector
+    from nbmanips.selector.mask_selector import MaskSelector
+    from nbmanips.selector.slice_selector import SliceSelector
+
+    if isinstance(selector, ListSelector):
+        label = "and" if selector._and else "or"
+    elif isinstance(selector, DefaultSelector):
+        arguments = [repr(arg) for arg in selector._args]
+        arguments += [f"{key}={value!r}" for key, value in selector._kwargs.items()]
+        label = f"{selector._key}({', '.join(arguments)})"
+    elif isinstance(selector, IndexSelector):
+        label = f"[{selector._index}]"
+    elif isinstance(selector, SliceSelector):
+        s = selector._slice
+        bounds = [s.start, s.stop] if s.step is None else [s.start, s.stop, s.step]
+        label = f"[{':'.join('' if b is None else str(b) for b in bounds)}]"
+    elif isinstance(selector, ContextSelector):
+        inner = _label(selector._selector)
+        label = f"context({inner}, before={selector._before}, after={selector._after})"
+    elif isinstance(selector, MaskSelector):
+        label = f"mask({selector._size} cells)"
+    elif isinstance(selector, CallableSelector):
+        label = getattr(selector._selector, "__name__", "callable")
+    elif isinstance(selector, TrueSelector):
+        label = "all"
+    else:
+        label = type(selector).__name__
+
+    return f"~{label}" if selector._neg else label
+
+
+class _ProfiledSelector(SelectorBase):
+    def __init__(self, selector: SelectorBase, stats: NodeStats):
+        self._selector = selector
+        self._stats = stats
+        super().__init__()
+        self._neg = selector._neg
+
+    @property
+    def cost(self) -> float:
+        return self._selector.cost
+
+    def get_callable(self, nb: RawNotebookType) -> Callable[[Cell], bool]:
+        return self._compile(nb, False)
+
+    def _compile(self, nb: RawNotebookType, neg: bool) -> Callable[[Cell], bool]:
+        start = perf_counter()
+        predicate = self._selector._compile(nb, neg)
+        self._stats.time += perf_counter() - start
+        return self._wrap(predicate)
+
+    def _plan(self, nb: RawNotebookType, neg: bool) -> PlanType:
+        return self._plan_within(nb, neg, None)
+
+    def _plan_within(
+        self, nb: RawNotebookType, neg: bool, within: Sequence[int] | None
+    ) -> PlanType:
+        stats = self._stats
+        start = perf_counter()
+        candidates, predicate = self._selector._plan_within(nb, neg, within)
+        stats.time += perf_counter() - start
+
+        if predicate is not None:
+            return candidates, self._wrap(predicate)
+
+        # exact plan: the node is evaluated on all its input cells at once
+        stats.calls += 1
+        stats.cells_in += len(nb["cells"]) if within is None else len(within)
+        stats.cells_out += len(nb["cells"]) if candidates is None else len(candidates)
+        return candidates, None
+
+    def _wrap(self, predicate: Callable[[Cell], bool]) -> Callable[[Cell], bool]:
+        stats = self._stats
+
+        def profiled(cell: Cell) -> bool:
+            start = perf_counter()
+            result = predicate(cell)
+            stats.time += perf_counter() - start
+            stats.calls += 1
+            stats.cells_in += 1
+            stats.cells_out += bool(result)
+            return result
+
+        return profiled
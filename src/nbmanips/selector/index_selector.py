@@ -2,7 +2,7 @@ from functools import partial
 from typing import Callable
 
 from nbmanips.cell import Cell
-from nbmanips.selector.base_selectors import SelectorBase
+from nbmanips.selector.base_selectors import LOW_COST, PlanType, SelectorBase
 
 
 def _selector(cell: Cell, index: int) -> bool:
@@ -10,12 +10,25 @@ def _selector(cell: Cell, index: int) -> bool:
 
 
 class IndexSelector(SelectorBase):
+    cost = LOW_COST
+    structural = True
+
     def __init__(self, index: int):
         self._index = index
         super().__init__()
 
     def get_callable(self, nb: dict) -> Callable[[Cell], bool]:
+        return partial(_selector, index=self._get_index(nb))
+
+    def _plan(self, nb: dict, neg: bool) -> PlanType:
+        if neg:
+            return super()._plan(nb, neg)
+
+        index = self._get_index(nb)
+        return ([index] if 0 <= index < len(nb["cells"]) else []), None
+
+    def _get_index(self, nb: dict) -> int:
         index = self._index
         if index < 0:
-            index = len(nb) + index
-        return partial(_selector, index=index)
+            index = len(nb.get("cells", [])) + index
+        return index
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import operator
+from typing import TYPE_CHECKING, Callable
+
+from nbmanips.cell import Cell
+from nbmanips.notebook.revision import Revision, get_fingerprint, get_revision
+from nbmanips.selector.base_selectors import LOW_COST, PlanType, SelectorBase
+
+if TYPE_CHECKING:
+    from nbmanips.notebook import RawNotebookType
+
+
+class MaskSelector(SelectorBase):
+    """
+    Materialized selection: the selected cell numbers are stored in an int bitmask.
+    """
+
+    cost = LOW_COST
+
+    def __init__(
+        self,
+        mask: int,
+        size: int,
+        selector: SelectorBase | None = None,
+        revision: Revision | None = None,
+        fingerprint: list[tuple] | None = None,
+    ):
+        """
+        :param mask: bitmask where the bit i is set if the cell i is selected
+        :param size: number of cells of the notebook the mask was computed on
+        :param selector: selector to fall back on once the notebook is modified
+        :param revision: revision of the notebook the mask was computed on
+        :param fingerprint: fingerprint of the cells the mask was computed on,
+         to detect the edits made without the Notebook/Cell API
+        """
+        self._mask = mask
+        self._size = size
+        self._selector = selector
+        self._revision = revision
+        self._version = None if revision is None else revision.version
+        self._fingerprint = fingerprint
+        super().__init__()
+
+    def __copy__(self) -> MaskSelector:
+        selector = self.__class__.__new__(self.__class__)
+        selector.__dict__.update(self.__dict__)
+        return selector
+
+    def __getstate__(self) -> dict:
+        # the mask is only valid in the process that computed it
+        return {
+            **self.__dict__,
+            "_revision": None,
+            "_version": None,
+            "_fingerprint": None,
+        }
+
+    @classmethod
+    def from_selector(cls, selector: SelectorBase, nb: RawNotebookType) -> MaskSelector:
+        size = len(nb["cells"])
+        bits = bytearray((size + 7) // 8)
+        for cell in selector.iter_cells(nb):
+            bits[cell.num >> 3] |= 1 << (cell.num & 7)
+        mask = int.from_bytes(bits, "little")
+        return cls(mask, size, selector, get_revision(nb), get_fingerprint(nb["cells"]))
+
+    def get_mask(self, neg: bool = False) -> int:
+        return self._get_mask(self._neg ^ neg)
+
+    def _get_mask(self, neg: bool) -> int:
+        if neg:
+            return ~self._mask & ((1 << self._size) - 1)
+        return self._mask
+
+    def is_valid(self, nb: RawNotebookType) -> bool:
+        if len(nb.get("cells", [])) != self._size:
+            return False
+
+        revision = self._revision
+        if revision is None:
+            return self._selector is None
+        return (
+            revision.raw_nb is nb
+            and revision.version == self._version
+            and get_fingerprint(nb["cells"]) == self._fingerprint
+        )
+
+    def _is_current(self, other: MaskSelector) -> bool:
+        revision = self._revision
+        if revision is None or other._revision is not revision:
+            return self._selector is None and other._selector is None
+        return (
+            self._version == other._version == revision.version
+            and self._fingerprint == other._fingerprint
+        )
+
+    def get_callable(self, nb: RawNotebookType) -> Callable[[Cell], bool]:
+        candidates, predicate = self._plan(nb, False)
+        if predicate is not None:
+            return predicate
+
+        indices = set(candidates)
+        return lambda cell: cell.num in indices
+
+    def _plan(self, nb: RawNotebookType, neg: bool) -> PlanType:
+        if self.is_valid(nb):
+            return _iter_bits(self._get_mask(neg)), None
+
+        if self._selector is None:
+            raise ValueError("The notebook was modified since the mask was computed")
+        return self._selector._plan(nb, self._selector._neg ^ neg)
+
+    def _combine_masks(self, other: SelectorBase, is_and: bool) -> SelectorBase | None:
+        if not isinstance(other, MaskSelector) or not self._is_current(other):
+            return None
+
+        combine = operator.and_ if is_and else operator.or_
+        mask = combine(self.get_mask(), other.get_mask())
+
+        selector = None
+        if self._selector is not None and other._selector is not None:
+            first, second = self._selector, other._selector
+            if self._neg:
+                first = ~first
+            if other._neg:
+                second = ~second
+            selector = combine(first, second)
+        return MaskSelector(
+            mask, self._size, selector, self._revision, self._fingerprint
+        )
+
+    def __and__(self, other: SelectorBase):
+        return self._combine_masks(other, True) or super().__and__(other)
+
+    def __or__(self, other: SelectorBase):
+        return self._combine_masks(other, False) or super().__or__(other)
+
+
+def _iter_bits(mask: int) -> list[int]:
+    indices = []
+    for i, byte in enumerate(mask.to_bytes((mask.bit_length() + 7) // 8, "little")):
+        if byte:
+            offset = i << 3
+            indices.extend(offset + bit for bit in range(8) if byte >> bit & 1)
+    return indices
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import ast
+from functools import reduce
+from operator import and_, or_
+
+from nbmanips.selector import Selector
+from nbmanips.selector.base_selectors import SelectorBase
+from nbmanips.selector.default_selector import DefaultSelector
+
+
+def parse_query(expression: str) -> SelectorBase:
+    """
+    Parses a selector expression, for example:
+    `is_code & (has_tag('train') | contains('fit', case=False)) & ~is_empty`
+
+    - names and calls are default selectors, the arguments must be literals
+    - `&`/`and`, `|`/`or` and `~`/`not` combine the selectors
+    - integers and `slice(start, stop, step)` select cells by position
+
+    :param expression: selector expression
+    :return: a selector
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid selector expression: {e.msg}") from None
+
+    return _build(tree.body)
+
+
+def _build(node: ast.expr) -> SelectorBase:
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.BitAnd, ast.BitOr)):
+        combine = and_ if isinstance(node.op, ast.BitAnd) else or_
+        selector = combine(_build(node.left), _build(node.right))
+    elif isinstance(node, ast.BoolOp):
+        combine = and_ if isinstance(node.op, ast.And) else or_
+        selector = reduce(combine, (_build(value) for value in node.values))
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Invert, ast.Not)):
+        selector = ~_build(node.operand)
+    elif isinstance(node, ast.Name):
+        selector = Selector(_get_key(node.id))
+    elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        selector = _build_call(node.func.id, node)
+    else:
+        value = _literal(node)
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError(f"Unexpected value in selector expression: {value!r}")
+        selector = Selector(value)
+
+    return selector
+
+
+def _build_call(key: str, node: ast.Call) -> SelectorBase:
+    args = [_literal(arg) for arg in node.args]
+    kwargs = {}
+    for keyword in node.keywords:
+        if keyword.arg is None:
+            raise ValueError("Unpacking is not supported in selector expressions")
+        kwargs[keyword.arg] = _literal(keyword.value)
+
+    if key == "slice":
+        if kwargs:
+            raise ValueError("slice() does not accept keyword arguments in selectors")
+        return Selector(slice(*args))
+    return Selector(_get_key(key), *args, **kwargs)
+
+
+def _get_key(key: str) -> str:
+    if key not in DefaultSelector.default_selectors:
+        raise ValueError(f"Unknown selector: {key!r}")
+    return key
+
+
+def _literal(node: ast.expr):
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        raise ValueError(
+            f"Selector arguments must be literals: {ast.unparse(node)!r}"
+        ) from None
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import base64
+import json
+import re
+from contextlib import suppress
+from typing import Any
+
+from nbmanips.selector.base_selectors import ListSelector, SelectorBase, TrueSelector
+
+
+class SerializationError(ValueError):
+    pass
+
+
+def to_dict(selector: SelectorBase) -> dict[str, Any]:
+    """
+    Converts a selector to a JSON-serializable dict.
+    Selectors that cannot be described (e.g. arbitrary callables) are pickled.
+
+    :param selector: selector to serialize
+    :return: a dict
+    """
+    try:
+        node = _to_dict(selector)
+    except SerializationError:
+        node = _pickle_node(selector)
+
+    if selector._neg:
+        node["neg"] = not node.get("neg", False)
+    return node
+
+
+def from_dict(node: dict[str, Any]) -> SelectorBase:
+    """
+    Builds a selector from its dict representation (see `to_dict`)
+
+    :param node: dict representation of the selector
+    :return: a selector
+    """
+    from nbmanips.selector import Selector
+
+    node_type = node["type"]
+    if node_type == "pickle":
+        import cloudpickle
+
+        selector = cloudpickle.loads(base64.b64decode(node["data"]))
+    elif node_type == "all":
+        selector = TrueSelector()
+    elif node_type == "index":
+        selector = Selector(node["index"])
+    elif node_type == "slice":
+        selector = Selector(slice(*node["slice"]))
+    elif node_type in {"and", "or"}:
+        selectors = [from_dict(sel) for sel in node["selectors"]]
+        selector = ListSelector(selectors, type=node_type)
+    elif node_type == "default":
+        args = [_decode(arg) for arg in node.get("args", [])]
+        kwargs = {key: _decode(value) for key, value in node.get("kwargs", {}).items()}
+        selector = Selector(node["key"], *args, **kwargs)
+    elif node_type == "context":
+        from nbmanips.selector.context_selector import ContextSelector
+
+        inner = from_dict(node["selector"])
+        selector = ContextSelector(inner, node["before"], node["after"])
+    elif node_type == "mask":
+        from nbmanips.selector.mask_selector import MaskSelector
+
+        selector = MaskSelector(int(node["mask"], 16), node["size"])
+    else:
+        raise ValueError(f"Unknown selector type: {node_type!r}")
+
+    if node.get("neg", False):
+        selector = ~selector
+    return selector
+
+
+def to_json(selector: SelectorBase) -> str:
+    """
+    Serializes a selector to a compact JSON string.
+    The output is canonical, so it can be hashed to key caches.
+    """
+    return json.dumps(to_dict(selector), sort_keys=True, separators=(",", ":"))
+
+
+def from_json(content: str | bytes) -> SelectorBase:
+    return from_dict(json.loads(content))
+
+
+def _to_dict(selector: SelectorBase) -> dict[str, Any]:
+    from nbmanips.selector.context_selector import ContextSelector
+    from nbmanips.selector.default_selector import DefaultSelector
+    from nbmanips.selector.index_selector import IndexSelector
+    from nbmanips.selector.mask_selector import MaskSelector
+    from nbmanips.selector.slice_selector import SliceSelector
+
+    if isinstance(selector, TrueSelector):
+        node: dict[str, Any] = {"type": "all"}
+    elif isinstance(selector, IndexSelector):
+        node = {"type": "index", "index": selector._index}
+    elif isinstance(selector, SliceSelector):
+        s = selector._slice
+        node = {"type": "slice", "slice": [s.start, s.stop, s.step]}
+    elif isinstance(selector, ListSelector):
+        node = {
+            "type": "and" if selector._and else "or",
+            "selectors": [to_dict(sel) for sel in selector._list],
+        }
+    elif isinstance(selector, DefaultSelector) and _is_builtin(selector._key):
+        node = {"type": "default", "key": selector._key}
+        if selector._args:
+            node["args"] = [_encode(arg) for arg in selector._args]
+        if selector._kwargs:
+            node["kwargs"] = {k: _encode(v) for k, v in selector._kwargs.items()}
+    elif isinstance(selector, ContextSelector):
+        node = {
+            "type": "context",
+            "selector": to_dict(selector._selector),
+            "before": selector._before,
+            "after": selector._after,
+        }
+    elif isinstance(selector, MaskSelector) and selector._selector is not None:
+        # the mask is only valid for the notebook it was computed on
+        node = to_dict(selector._selector)
+    elif isinstance(selector, MaskSelector):
+        node = {"type": "mask", "mask": hex(selector._mask), "size": selector._size}
+    else:
+        raise SerializationError(f"Cannot serialize {type(selector).__name__}")
+
+    return node
+
+
+def _is_builtin(key: str) -> bool:
+    # selectors registered by users might not be registered in the reading process
+    from nbmanips.selector.default_selector import DefaultSelector
+
+    selector = DefaultSelector.default_selectors[key]
+    return getattr(selector, "__module__", "").startswith("nbmanips.")
+
+
+def _pickle_node(selector: SelectorBase) -> dict[str, Any]:
+    import cloudpickle
+
+    selector = ~selector if selector._neg else selector
+    data = base64.b64encode(cloudpickle.dumps(selector)).decode("ascii")
+    return {"type": "pickle", "data": data}
+
+
+def _encode(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [_encode(el) for el in value]
+    if isinstance(value, tuple):
+        return {"$tuple": [_encode(el) for el in value]}
+    if isinstance(value, (set, frozenset)):
+        elements = [_encode(el) for el in value]
+        with suppress(TypeError):
+            elements.sort()
+        return {"$set": elements}
+    if isinstance(value, re.Pattern):
+        return {"$regex": value.pattern, "flags": value.flags}
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        return {"$dict": {key: _encode(el) for key, el in value.items()}}
+    raise SerializationError(f"Cannot serialize {type(value).__name__}")
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode(el) for el in value]
+    if not isinstance(value, dict):
+        return value
+    if "$tuple" in value:
+        return tuple(_decode(el) for el in value["$tuple"])
+    if "$set" in value:
+        return {_decode(el) for el in value["$set"]}
+    if "$regex" in value:
+        return re.compile(value["$regex"], value.get("flags", 0))
+    return {key: _decode(el) for key, el in value["$dict"].items()}
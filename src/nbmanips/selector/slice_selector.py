@@ -1,47 +1,34 @@
 from __future__ import annotations
 
-from functools import partial
 from typing import Callable
 
 from nbmanips.cell import Cell
-from nbmanips.selector.base_selectors import SelectorBase
+from nbmanips.selector.base_selectors import LOW_COST, PlanType, SelectorBase
 
 
 class SliceSelector(SelectorBase):
+    """
+    Selects the cells whose numbers are in the slice, like a list slice:
+    `slice(5, 1, -2)` selects the cells 5 and 3.
+    """
+
+    cost = LOW_COST
+    structural = True
+
     def __init__(self, selector: slice) -> None:
         self._slice = selector
         super().__init__()
 
     def get_callable(self, nb: dict) -> Callable[[Cell], bool]:
-        new_slice = self.__adapt_slice(self._slice, len(nb.get("cells", [])))
-        return self.__get_slice_selector(new_slice)
-
-    @staticmethod
-    def __adapt_slice(old_slice: slice, n_cells: int) -> slice:
-        start, stop, step = old_slice.start, old_slice.stop, old_slice.step
-        if stop is not None and stop < 0:
-            stop = stop + n_cells
-        if start is not None and start < 0:
-            start = start + n_cells
-
-        new_slice = slice(start, stop, step)
-        return new_slice
-
-    @classmethod
-    def __get_slice_selector(cls, selector: slice) -> Callable[[Cell], bool]:
-        start, stop, step = selector.start, selector.stop, selector.step
-        if step and step < 0:
-            start, stop = stop + 1, start + 1
-
-        selector_list = []
-        if start is not None:
-            selector_list.append(lambda cell: cell.num >= start)
-        if stop is not None:
-            selector_list.append(lambda cell: cell.num < stop)
-        if step is not None:
-            selector_list.append(lambda cell: (cell.num - start) % abs(step) == 0)
-        return partial(cls.__get_multiple_selector, selector_list=selector_list)
-
-    @staticmethod
-    def __get_multiple_selector(cell: Cell, selector_list: list[SelectorBase]) -> bool:
-        return all(sel(cell) for sel in selector_list)
+        indices = self._get_range(len(nb.get("cells", [])))
+        return lambda cell: cell.num in indices
+
+    def _plan(self, nb: dict, neg: bool) -> PlanType:
+        if neg:
+            return super()._plan(nb, neg)
+
+        indices = self._get_range(len(nb["cells"]))
+        return (indices if indices.step > 0 else indices[::-1]), None
+
+    def _get_range(self, n_cells: int) -> range:
+        return range(*self._slice.indices(n_cells))
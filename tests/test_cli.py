@@ -3,7 +3,7 @@ from pathlib import Path
 import pytest
 from click.testing import CliRunner
 
-from nbmanips import IPYNB
+from nbmanips import IPYNB, Notebook
 from nbmanips.__main__ import nbmanips as cli
 
 
@@ -40,15 +40,74 @@ def test_select_1(runner, test_files):
     assert result.output.strip() == "2"
 
 
-def test_select_2(runner, test_files):
+def test_select_raw_output(runner, test_files):
+    selection_result = runner.invoke(
+        cli, ["select", "contains", "Figure", "--raw-output"]
+    )
+    assert selection_result.exit_code == 0
+
+    result = runner.invoke(
+        cli,
+        ["list", str(test_files / "nb3.ipynb")],
+        input=selection_result.stdout_bytes,
+    )
+
+    assert result.exit_code == 0
+    assert result.output.strip() == "[3, 4]"
+
+
+def test_select_pickled_selector(runner, test_files):
     import cloudpickle
 
+    from nbmanips.selector import Selector
+
+    result = runner.invoke(
+        cli,
+        ["list", str(test_files / "nb3.ipynb")],
+        input=cloudpickle.dumps(Selector("is_empty")),
+    )
+
+    assert result.exit_code == 0
+    assert result.output.strip() == "[5, 8]"
+
+
+def test_select_explain(runner, test_files):
+    result = runner.invoke(
+        cli, ["select", "--explain", str(test_files / "nb6.ipynb"), "is_code"]
+    )
+    assert result.exit_code == 0
+    assert "is_code()" in result.stderr
+    assert "9 cells selected" in result.stderr
+
+
+def test_select_context(runner, test_files):
+    selection_result = runner.invoke(cli, ["select", "-A", "1", "0"])
+    assert selection_result.exit_code == 0
+
+    result = runner.invoke(
+        cli,
+        ["select", "--context", "1", "-o", "14"],
+        input=selection_result.stdout_bytes,
+    )
+    assert result.exit_code == 0
+
+    result = runner.invoke(
+        cli, ["list", str(test_files / "nb6.ipynb")], input=result.stdout_bytes
+    )
+    assert result.output.strip() == "[0, 1, 2, 13, 14]"
+
+
+def test_select_2(runner, test_files):
+    import json
+
     from nbmanips.selector import SelectorBase
+    from nbmanips.selector.serialization import from_json
 
     selection_result = runner.invoke(cli, ["select", "is_empty"])
     assert selection_result.exit_code == 0
 
-    selector = cloudpickle.loads(selection_result.stdout_bytes)
+    assert json.loads(selection_result.stdout) == {"type": "default", "key": "is_empty"}
+    selector = from_json(selection_result.stdout_bytes)
     assert isinstance(selector, SelectorBase)
 
     result = runner.invoke(
@@ -137,6 +196,16 @@ def test_show(runner, test_files):
     assert len(result.output.strip().split("\n")) >= 3
 
 
+def test_show_pager(runner, test_files):
+    result = runner.invoke(cli, ["show", str(test_files / "nb1.ipynb")])
+    paged_result = runner.invoke(
+        cli, ["show", "--pager", str(test_files / "nb1.ipynb")]
+    )
+
+    assert paged_result.exit_code == 0
+    assert paged_result.output == result.output
+
+
 def test_count(runner, test_files):
     result = runner.invoke(cli, ["count", str(test_files / "nb1.ipynb")])
 
@@ -144,6 +213,85 @@ def test_count(runner, test_files):
     assert int(result.output.strip()) == 4
 
 
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("has_slide_type('slide')", [0]),
+        ("is_new_slide", [0, 1]),
+        ("has_slide_type(['subslide', 'skip'])", [1, 2]),
+        ("has_tag('tagged')", [2]),
+        ("has_tag('untagged')", []),
+    ],
+)
+def test_structural_query(runner, nb1_0, tmp_path, query, expected):
+    # the selectors reading the cell metadata are evaluated on the read cells
+    nb1_0[2].add_tag("tagged")
+    nb_path = str(tmp_path / "nb1.ipynb")
+    nb1_0.to_ipynb(nb_path)
+
+    result = runner.invoke(cli, ["list", nb_path, "-q", query])
+    assert result.exit_code == 0
+    assert result.output.strip() == str(expected)
+
+    for command, cell in (("first", expected[:1]), ("last", expected[-1:])):
+        result = runner.invoke(cli, [command, nb_path, "-q", query])
+        assert result.exit_code == 0
+        assert result.output.strip() == (str(cell[0]) if cell else "")
+
+
+def test_count_query(runner, test_files):
+    nb_path = str(test_files / "nb3.ipynb")
+    result = runner.invoke(cli, ["count", nb_path, "-q", "contains('df') & ~2"])
+
+    assert result.exit_code == 0
+    assert int(result.output.strip()) == 3
+
+    selection_result = runner.invoke(cli, ["select", "has_output_type", "text/plain"])
+    result = runner.invoke(
+        cli,
+        ["list", nb_path, "--query", "contains('DF', case=False)"],
+        input=selection_result.stdout_bytes,
+    )
+    assert result.exit_code == 0
+    assert result.output.strip() == "[2, 3, 4]"
+
+    nb_path = str(test_files / "nb6.ipynb")
+    query = "is_code & in_section('Part 1')"
+    result = runner.invoke(cli, ["count", nb_path, "-q", query])
+    assert result.exit_code == 0
+    assert int(result.output.strip()) == 4
+
+    result = runner.invoke(cli, ["count", nb_path, "-q", "unknown_selector"])
+    assert result.exit_code != 0
+    assert "Unknown selector" in result.output
+
+
+def test_index(runner, test_files, tmp_path):
+    import shutil
+
+    shutil.copy(test_files / "nb3.ipynb", tmp_path / "nb3.ipynb")
+    result = runner.invoke(cli, ["search", str(tmp_path), "-t", "pandas", "--index"])
+    assert result.exit_code != 0
+
+    result = runner.invoke(cli, ["index", "build", str(tmp_path)])
+    assert result.exit_code == 0
+    assert result.output.startswith("1 indexed")
+
+    result = runner.invoke(cli, ["index", "update", str(tmp_path)])
+    assert result.output.startswith("0 indexed, 1 unchanged")
+
+    result = runner.invoke(cli, ["search", str(tmp_path), "-t", "pandas", "--index"])
+    assert result.exit_code == 0
+    assert result.output.strip() == f"{tmp_path / 'nb3.ipynb'}:0"
+
+    for options in (["--case"], ["-r"], ["-c"], ["-q", "is_code"]):
+        result = runner.invoke(
+            cli, ["search", str(tmp_path), "-t", "pandas", "--index", *options]
+        )
+        assert result.exit_code == 2
+        assert "--index does not support" in result.output
+
+
 def test_first(runner, test_files):
     selection_result = runner.invoke(cli, ["select", "is_empty"])
     assert selection_result.exit_code == 0
@@ -193,6 +341,75 @@ def test_search(runner, test_files):
     assert result.output.strip() == "[0, 2, 3]"
 
 
+def test_search_patterns_file(runner, test_files, tmp_path):
+    patterns_file = tmp_path / "patterns.txt"
+    patterns_file.write_text("a\n\nhello\njupyter\n")
+
+    result = runner.invoke(
+        cli, ["search", "-f", str(patterns_file), str(test_files / "nb1.ipynb")]
+    )
+    assert result.exit_code == 0
+    assert result.output.splitlines() == ["a: [0, 2, 3]", "hello: [1]"]
+
+
+def test_search_code(runner, test_files):
+    nb_path = str(test_files / "nb3.ipynb")
+    result = runner.invoke(cli, ["search", "-t", "plt", nb_path, "--code"])
+    assert result.exit_code == 0
+    assert result.output.strip() == "[0, 3, 4]"
+
+    result = runner.invoke(cli, ["search", "-t", "show", "-c", "call", nb_path])
+    assert result.exit_code == 0
+    assert result.output.strip() == "[3]"
+
+
+def test_replace_mapping_file(runner, test_files):
+    nb3 = Path(str(test_files / "nb3.ipynb")).read_text()
+    with runner.isolated_filesystem():
+        Path("nb.ipynb").write_text(nb3)
+        Path("mapping.tsv").write_text("df\tdata\npd\tpandas\n\nplt.\tpyplot.\n")
+
+        result = runner.invoke(
+            cli, ["replace", "-F", "mapping.tsv", "nb.ipynb", "-o", "nb1.ipynb"]
+        )
+        assert result.exit_code == 0
+
+        nb = IPYNB("nb1.ipynb")
+        assert nb.search_all("df") == []
+        assert nb.search_all("data") == [1, 2, 3, 4]
+        assert nb.search_all("pandas") == [0, 1]
+        assert nb.search_all("pyplot.") == [3, 4]
+
+        Path("mapping.tsv").write_text("df data\n")
+        result = runner.invoke(cli, ["replace", "-F", "mapping.tsv", "nb.ipynb", "-f"])
+        assert result.exit_code == 2
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_grep(runner, test_files, tmp_path, jobs):
+    (tmp_path / "sub").mkdir()
+    nb1_path = tmp_path / "nb1.ipynb"
+    nb3_path = tmp_path / "sub" / "nb3.ipynb"
+    nb1_path.write_text((test_files / "nb1.ipynb").read_text())
+    nb3_path.write_text((test_files / "nb3.ipynb").read_text())
+
+    result = runner.invoke(cli, ["grep", "print", str(tmp_path), "-r", "-j", jobs])
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        f'{nb1_path}:1:1: print("Hello World")',
+        f'{nb3_path}:6:1: print("Test")',
+    ]
+
+    result = runner.invoke(cli, ["grep", "-l", "plt", str(tmp_path), "-r"])
+    assert result.output.splitlines() == [str(nb3_path)]
+
+    result = runner.invoke(cli, ["grep", "-c", "-m", "2", "plt", str(tmp_path), "-r"])
+    assert result.output.splitlines() == [f"{nb1_path}:0", f"{nb3_path}:2"]
+
+    result = runner.invoke(cli, ["grep", "sklearn", str(tmp_path / "*.ipynb")])
+    assert result.exit_code == 1
+
+
 def test_erase(runner, test_files):
     nb3 = Path(str(test_files / "nb3.ipynb")).read_text()
     with runner.isolated_filesystem():
@@ -398,6 +615,21 @@ def test_split(runner, test_files):
         assert result.exit_code == 0
 
 
+def test_split_jobs(runner, test_files):
+    nb6 = Path(str(test_files / "nb6.ipynb")).read_text()
+    with runner.isolated_filesystem():
+        Path("nb.ipynb").write_text(nb6)
+
+        result = runner.invoke(cli, ["split", "nb.ipynb", "1,3,6,9", "-j", "2"])
+        assert result.exit_code == 0
+
+        cells = [len(IPYNB(f"nb-{i}.ipynb").cells) for i in range(5)]
+        assert cells == [1, 2, 3, 3, len(IPYNB("nb.ipynb").cells) - 9]
+
+        result = runner.invoke(cli, ["split", "nb.ipynb", "1,3,6,9", "-j", "2"])
+        assert result.exit_code == 1
+
+
 def test_split_on_selection(runner, test_files):
     nb6 = Path(str(test_files / "nb6.ipynb")).read_text()
     with runner.isolated_filesystem():
@@ -482,3 +714,37 @@ def test_attachments(runner: CliRunner, test_files):
         result = runner.invoke(cli, ["burn", "nb.ipynb", "-f"])
         assert result.exit_code == 0
         assert len(Path("nb.ipynb").read_text()) > 2 * original_size
+
+
+def test_stdio_pipeline(runner, test_files):
+    nb3 = Path(str(test_files / "nb3.ipynb")).read_text()
+    with runner.isolated_filesystem():
+        selection_result = runner.invoke(cli, ["select", "is_empty"])
+        Path("selector").write_bytes(selection_result.stdout_bytes)
+
+        result = runner.invoke(cli, ["erase-output", "-", "-o", "-"], input=nb3)
+        assert result.exit_code == 0
+
+        result = runner.invoke(
+            cli,
+            ["delete", "-", "-S", "selector", "-o", "out.ipynb"],
+            input=result.stdout,
+        )
+        assert result.exit_code == 0
+
+        nb = IPYNB("out.ipynb")
+        assert nb.count() == 7
+        assert nb.select("has_output").count() == 0
+
+
+def test_stdio_default_output(runner, test_files):
+    nb1 = Path(str(test_files / "nb1.ipynb")).read_text()
+    selection_result = runner.invoke(cli, ["select", "0"])
+
+    with runner.isolated_filesystem():
+        Path("selector").write_bytes(selection_result.stdout_bytes)
+        result = runner.invoke(cli, ["keep", "-", "-S", "selector"], input=nb1)
+        assert result.exit_code == 0
+
+    nb = Notebook.from_json(result.stdout)
+    assert nb.count() == 1
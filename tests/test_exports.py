@@ -80,3 +80,71 @@ def test_dbc_exporter(nb1, output_files):
     exp = DbcExporter()
     exp.export(nb1, path)
     assert os.path.exists(path)
+
+
+@pytest.mark.parametrize("compression", ["stored", "deflate", "bzip2", "lzma"])
+def test_dbc_exporter_compression(nb3, output_files, compression):
+    import zipfile
+
+    from nbmanips.exporters import COMPRESSION_METHODS
+
+    path = f"{output_files}/test_{compression}.dbc"
+    nb3.to_dbc(path, compression=compression)
+    with zipfile.ZipFile(path) as zf:
+        (info,) = zf.infolist()
+        assert info.compress_type == COMPRESSION_METHODS[compression]
+
+    assert len(Notebook.read_dbc(path).cells) == len(nb3.cells)
+
+
+def test_dbc_exporter_invalid_compression(nb1, output_files):
+    with pytest.raises(ValueError, match="compression"):
+        nb1.to_dbc(f"{output_files}/test_invalid.dbc", compression="zstd")
+
+
+def test_notebook_node_view(nb3):
+    from nbmanips.notebook.ipynb import NotebookNodeView
+
+    node = nb3.to_notebook_node(copy=False)
+    assert isinstance(node, NotebookNodeView)
+    assert node == nb3.to_notebook_node()
+
+    cell = node.cells[2]
+    assert cell.outputs[0] is node["cells"][2]["outputs"][0]
+    assert cell.source is nb3.cells[2]["source"]
+
+
+def test_notebook_node_view_export(nb3):
+    exporter = Notebook.get_exporter("markdown")
+    body, _ = exporter.from_notebook_node(nb3.to_notebook_node(copy=False))
+    expected, _ = exporter.from_notebook_node(nb3.to_notebook_node())
+    assert body == expected
+
+
+def test_notebook_node_view_multiline(nb1_0):
+    nb1_0.metadata["text"] = ["a\n", "b"]
+    cell = nb1_0.cells[1]
+    cell["metadata"]["source"] = ["a\n", "b"]
+    cell["outputs"] = [
+        {"output_type": "stream", "name": "stdout", "text": ["a\n", "b"]},
+        {
+            "output_type": "display_data",
+            "data": {"text/plain": ["a\n", "b"], "application/json": ["a", "b"]},
+            "metadata": {"text/plain": ["a\n", "b"]},
+        },
+    ]
+
+    # only the sources, the stream texts and the mime bundles are rejoined
+    node = nb1_0.to_notebook_node(copy=False)
+    expected = nb1_0.to_notebook_node()
+    assert node.metadata.text == expected.metadata.text == ["a\n", "b"]
+    cell, expected_cell = node.cells[1], expected.cells[1]
+    assert cell.metadata.source == expected_cell.metadata.source == ["a\n", "b"]
+    stream, display = cell.outputs
+    expected_stream, expected_display = expected_cell.outputs
+    assert stream.text == expected_stream.text == "a\nb"
+    # the values are rejoined when they are read
+    data, metadata = dict(display.data.items()), dict(display.metadata.items())
+    assert data == expected_display.data
+    assert data == {"text/plain": "a\nb", "application/json": ["a", "b"]}
+    assert metadata == expected_display.metadata == {"text/plain": ["a\n", "b"]}
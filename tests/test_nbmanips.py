@@ -110,6 +110,34 @@ def test_search_all(nb1, search_term, case, output, expected):
     assert nb1.search_all(search_term, case=case, output=output) == expected
 
 
+@pytest.mark.parametrize(
+    "patterns, case, output, regex",
+    [
+        (["part", "art", "PART 3", "t 3.1", "zzz", "(x"], False, False, False),
+        (["part", "art", "PART 3"], True, "raw", False),
+        ([r"p\w+t \d", r"\d\.\d", "x"], False, True, True),
+        # backreferences, named groups and global flags cannot be combined
+        (
+            [r"(\w)\1", r"(?P<p0>art)", r"(?P<p0>P)(?P=p0)", r"(?i)PART 2"],
+            True,
+            False,
+            True,
+        ),
+        ([r"(?P<x>\w)(?P=x)", r"(t)(?(1)\s)", r"sub(part)", "p0"], False, False, True),
+    ],
+)
+def test_search_many(nb6, patterns, case, output, regex):
+    expected = {
+        pattern: nb6.search_all(pattern, case=case, output=output, regex=regex)
+        for pattern in patterns
+    }
+    assert nb6.search_many(patterns, case, output, regex) == expected
+    assert nb6[:8].search_many(patterns, case, output, regex) == {
+        pattern: [num for num in cells if num < 8]
+        for pattern, cells in expected.items()
+    }
+
+
 @pytest.mark.parametrize(
     "old, new, case, count, regex, expected_old, expected_new",
     [
@@ -138,6 +166,50 @@ def test_replace(nb1_0, old, new, case, count, regex, expected_old, expected_new
     assert nb1_0.search_all(new, case=True) == expected_new
 
 
+@pytest.mark.parametrize(
+    "mapping, kwargs, expected",
+    [
+        (
+            {"Hello": "Hi", "Hello World": "Bonjour", "a": "b"},
+            {},
+            ["# My Fbncy Title", 'print("Bonjour")', "b = 25 * 5", "b"],
+        ),
+        # the replaced text is not searched again
+        (
+            {"a": "A", "A": "a", "hello": "hi"},
+            {"case": False},
+            ["# My FAncy Title", 'print("hi World")', "A = 25 * 5", "A"],
+        ),
+        (
+            {r"(\d+) \* (\d+)": r"\2 * \1", r"(?P<word>\w+) World": r"\g<word>!"},
+            {"regex": True},
+            ["# My Fancy Title", 'print("Hello!")', "a = 5 * 25", "a"],
+        ),
+    ],
+)
+def test_replace_many(nb1_0, mapping, kwargs, expected):
+    nb1_0.replace_many(mapping, **kwargs)
+    assert [cell.source for cell in nb1_0.iter_cells()] == expected
+
+
+@pytest.mark.parametrize("case", [True, False])
+def test_replace_many_regex(test_files, nb1_0, case):
+    mapping = {
+        r"(\w)\1": r"<\1\1>",
+        r"(?P<n>\d+) \* (\d+)": r"\2 * \g<n>",
+        r"(?i)title": "Name",
+        r"(print)\(": r"\1 (",
+    }
+    nb1_0.replace_many(mapping, regex=True, case=case)
+
+    nb = Notebook.read_ipynb(test_files / "nb1.ipynb")
+    for old, new in mapping.items():
+        nb.replace(old, new, regex=True, case=case)
+    sources = [cell.source for cell in nb.iter_cells()]
+    assert [cell.source for cell in nb1_0.iter_cells()] == sources
+    assert sources == ["# My Fancy Name", 'print ("He<ll>o World")', "a = 5 * 25", "a"]
+
+
 @pytest.mark.parametrize(
     "selector, selector_kwargs, search_term, expected",
     [
@@ -421,3 +493,231 @@ def test_attachments(nb7: Notebook):
         cell = nb7.cells[cell_idx]
         assert cell["source"] == source
         assert len(cell["attachments"]) == 1
+
+
+def test_iter_split_copies(nb6):
+    pieces = nb6.iter_split(1, 6)
+    first = next(pieces)
+    assert len(first) == 1
+    assert first.cells[0] is not nb6.cells[0]
+    assert first.cells[0] == nb6.cells[0]
+    assert [len(nb) for nb in pieces] == [5, len(nb6) - 6]
+
+
+def test_iter_str(nb1, capsys):
+    cells = list(nb1.iter_str(width=40, use_pygments=False))
+    assert len(cells) == len(nb1)
+    assert "\n".join(cells) == nb1.to_str(width=40, use_pygments=False)
+
+    nb1.show(width=40, use_pygments=False)
+    assert capsys.readouterr().out == "\n".join(cells) + "\n"
+
+
+def test_selection_cache(nb1_0):
+    visited = []
+
+    def visit(cell):
+        visited.append(cell.num)
+        return cell.source.startswith("a")
+
+    selection = nb1_0.select(visit)
+    assert len(selection) == 2
+    assert selection.list() == [2, 3]
+    assert selection.first_cell().num == 2
+    assert visited == [0, 1, 2, 3]
+
+    selection.first_cell().source = "b = 1"
+    assert selection.list() == [3]
+    assert len(visited) == 8
+
+    nb1_0.select(0).delete()
+    assert selection.list() == [2]
+    assert nb1_0.select("is_markdown").list() == []
+
+
+def test_selection_cache_direct_edits(nb1_0):
+    selection = nb1_0.select(
+        lambda cell: (
+            cell.metadata.get("tags") == ["x"]
+            or cell.type == "raw"
+            or cell.source == "b"
+        )
+    )
+    assert selection.list() == []
+
+    nb1_0.first_cell().metadata["tags"] = ["x"]
+    assert selection.list() == [0]
+
+    nb1_0.cells[2]["cell_type"] = "raw"
+    assert len(selection) == 2
+
+    nb1_0.cells[3]["source"] = "b"
+    assert selection.list() == [0, 2, 3]
+    assert selection.first_cell().num == 0
+
+    # replaced by a dict of the same length
+    nb1_0.cells[1]["metadata"] = {"tags": ["x"]}
+    assert selection.list() == [0, 1, 2, 3]
+
+
+def test_text_cache_direct_edits(nb1_0):
+    assert nb1_0.search_all("zzqq", output=True) == []
+    assert nb1_0.search_all("zzqq", output="raw") == []
+
+    # outputs modified in place, without the Notebook API
+    outputs = nb1_0.cells[1]["outputs"]
+    outputs.append({"output_type": "stream", "name": "stdout", "text": "zzqq\n"})
+    assert nb1_0.search_all("zzqq", output=True) == [1]
+    assert nb1_0.search_all("zzqq", output="raw") == [1]
+
+    outputs[-1] = {"output_type": "stream", "name": "stdout", "text": "zzqr\n"}
+    assert nb1_0.search_all("zzqq", output=True) == []
+    assert nb1_0.search_all("zzqr", output=True) == [1]
+
+    nb1_0.cells[2]["source"] = ["zzqq = 1\n", "zzqq"]
+    assert nb1_0.search_all("zzqq") == [2]
+    nb1_0.cells[2]["source"].pop()
+    nb1_0.cells[2]["source"][0] = "a = 1"
+    assert nb1_0.search_all("zzqq") == []
+
+
+def test_materialize_mutation(nb1_0):
+    selection = nb1_0.select("contains", "a").materialize()
+    assert selection.list() == [0, 2, 3]
+
+    nb1_0.select(2).erase()
+    assert selection.list() == [0, 3]
+
+
+def test_iter_cells_reverse(nb6):
+    visited = []
+
+    def visit(cell):
+        visited.append(cell.num)
+        return cell.type == "code"
+
+    assert nb6.select(visit).last() == 14
+    assert visited == [14]
+
+    selection = nb6.select("is_code")
+    expected = selection.list()[::-1]
+    assert [cell.num for cell in selection.iter_cells(reverse=True)] == expected
+    assert [cell.num for cell in nb6[2:9].iter_cells(reverse=True)] == list(
+        range(8, 1, -1)
+    )
+    assert nb6.select("is_markdown").last_cell().num == 12
+
+
+@pytest.mark.parametrize(
+    "selector",
+    [
+        "is_code",
+        ["is_code", "is_empty"],
+        Selector("is_markdown") & Selector("contains", "a"),
+        ~Selector(slice(2, 5)),
+        Selector("contains", "a") | Selector(0),
+        Selector("is_code") & Selector("in_section", "Part 1"),
+    ],
+)
+def test_read_select(test_files, nb6_0, selector):
+    nb = Notebook.read(str(test_files / "nb6.ipynb"), select=selector)
+    assert nb.cells == [cell.cell for cell in nb6_0.select(selector).iter_cells()]
+    assert nb.cells
+
+
+def test_read_fields(test_files, nb6_0):
+    path = str(test_files / "nb6.ipynb")
+    nb = Notebook.read(path, select="is_code", fields=["source"])
+
+    code_cells = nb6_0.select("is_code")
+    assert [cell["source"] for cell in nb.cells] == code_cells.map(lambda c: c.source)
+    assert all(cell["outputs"] == [] for cell in nb.cells)
+    assert code_cells.select("has_output").count() > 0
+    assert (
+        Notebook.from_json(nb6_0.to_json(), fields=()).select("is_empty").count() == 15
+    )
+
+
+def test_sections(nb6_0):
+    sections = nb6_0.sections()
+    assert [(s.level, s.start, s.end) for s in sections] == [
+        (1, 0, 8),
+        (2, 2, 4),
+        (2, 4, 8),
+        (3, 6, 8),
+        (1, 8, 12),
+        (1, 12, 15),
+        (2, 12, 15),
+    ]
+    assert [(s.level - 1, s.title, s.start) for s in sections] == nb6_0.toc
+
+    nb6_0.select(2).erase()
+    assert [s.start for s in nb6_0.sections()] == [0, 4, 6, 8, 12, 12]
+
+
+def test_index(test_files, tmp_path):
+    import shutil
+
+    from nbmanips.index import NotebookIndex
+
+    for name in ["nb1.ipynb", "nb3.ipynb", "nb6.ipynb"]:
+        shutil.copy(test_files / name, tmp_path / name)
+
+    nb_index = NotebookIndex(tmp_path)
+    assert nb_index.build()[:3] == (3, 0, 0)
+
+    nb3 = Notebook.read(str(tmp_path / "nb3.ipynb"))
+    hits = nb_index.search("import pandas")
+    assert [(hit.path, hit.cell) for hit in hits] == [("nb3.ipynb", 0)]
+    assert "pandas" in nb3.cells[0]["source"]
+
+    nb3.select(0).erase()
+    nb3.to_ipynb(str(tmp_path / "nb3.ipynb"))
+    (tmp_path / "nb1.ipynb").unlink()
+    assert nb_index.update()[:3] == (1, 1, 1)
+    assert nb_index.search("import pandas") == []
+    assert nb_index.search("Part", limit=1)[0].path == "nb6.ipynb"
+    nb_index.close()
+
+
+def test_text_cache(nb3_0, monkeypatch):
+    from nbmanips.cell import Cell
+
+    rendered = []
+    get_output = Cell.get_output
+
+    def counting_get_output(self, *args, **kwargs):
+        rendered.append(self.num)
+        return get_output(self, *args, **kwargs)
+
+    monkeypatch.setattr(Cell, "get_output", counting_get_output)
+
+    expected = nb3_0.search_all("a", output=True)
+    n_rendered = len(rendered)
+    assert n_rendered > 0
+    assert nb3_0.search_all("a", output=True) == expected
+    nb3_0.select("has_match", "b", output=True).list()
+    assert len(rendered) == n_rendered
+
+    nb3_0.erase_output()
+    assert nb3_0.search_all("a", output=True) == nb3_0.search_all("a") != expected
+    assert len(rendered) > n_rendered
+
+    # the cache is also dropped if the cells are modified directly
+    nb3_0.cells[0]["source"] = "unique_text"
+    assert nb3_0.search_all("unique_text") == [0]
+
+
+def test_grep_notebook(test_files, monkeypatch):
+    from nbmanips.grep import GrepHit, grep_notebook
+
+    path = str(test_files / "nb3.ipynb")
+    assert grep_notebook(path, "plt", max_count=2).hits == [
+        GrepHit(path, 0, 2, "import matplotlib.pyplot as plt"),
+        GrepHit(path, 3, 1, 'plt.plot(df["col1"], df["col2"])'),
+    ]
+    assert [hit.cell for hit in grep_notebook(path, r"^df$", regex=True).hits] == [2]
+
+    # the notebooks that cannot match are not parsed
+    monkeypatch.setattr(Notebook, "from_json", None)
+    assert grep_notebook(path, "SKLEARN", case=False).hits == []
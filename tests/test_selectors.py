@@ -1,7 +1,20 @@
+import json
+import re
+
 import pytest
 
 from nbmanips import Notebook
+from nbmanips.cell.output_parsers import ParserBase
 from nbmanips.selector import Selector
+from nbmanips.selector.base_selectors import (
+    DEFAULT_COST,
+    HIGH_COST,
+    LOW_COST,
+    ListSelector,
+)
+from nbmanips.selector.context_selector import ContextSelector
+from nbmanips.selector.default_selector import DefaultSelector
+from nbmanips.selector.mask_selector import MaskSelector
 
 
 @pytest.mark.parametrize(
@@ -167,3 +180,492 @@ def test_has_tag(nb6_0: Notebook):
     assert nb6_0.select("has_tag", "Toc").list() == [5, 8]
     assert nb6_0.select("has_tag", "toc", case=True).list() == [5]
     assert nb6_0.select("has_tag", "Toc", case=True).list() == [8]
+
+
+@pytest.mark.parametrize(
+    "selector",
+    [
+        ~(Selector("contains", "o") & Selector("contains", "=")),
+        ~(Selector("contains", "o") | ~Selector("contains", "=")),
+        Selector(slice(1, None)) & ~(Selector("contains", "a") | Selector(0)),
+        ~(Selector(slice(1, None)) & ~(Selector("contains", "a") | Selector(0))),
+        Selector("is_code") | (Selector("contains", "a") & ~Selector("is_markdown")),
+    ],
+)
+def test_compiled_selector(nb1: Notebook, selector):
+    from nbmanips.cell import Cell
+
+    def evaluate(sel, cell):
+        if isinstance(sel, ListSelector):
+            op = all if sel._and else any
+            result = op(evaluate(sub_sel, cell) for sub_sel in sel._list)
+        else:
+            result = bool(sel.get_callable(nb1.raw_nb)(cell))
+        return result ^ sel._neg
+
+    cells = [Cell(cell, i) for i, cell in enumerate(nb1.cells)]
+    expected = [cell.num for cell in cells if evaluate(selector, cell)]
+    assert nb1.select(selector).list() == expected
+    assert [
+        cell.num for cell in cells if selector.compile(nb1.raw_nb)(cell)
+    ] == expected
+
+
+@pytest.mark.parametrize(
+    "slice_", [(None, None, 2), (None, None, -1), (-10, 2), (5, 1, -2), (-2, None, -3)]
+)
+def test_slice_selector_range(nb6: Notebook, slice_: list):
+    expected = sorted(range(len(nb6))[slice(*slice_)])
+    assert nb6.select(slice(*slice_)).list() == expected
+    assert nb6.select(~Selector(slice(*slice_))).list() == [
+        num for num in range(len(nb6)) if num not in expected
+    ]
+
+
+def test_slice_selector_negative_step(nb6: Notebook):
+    # like list slices: the cells are counted from the start of the slice
+    assert nb6.select(slice(5, 1, -2)).list() == [3, 5]
+    assert nb6[5:1:-2].list() == [3, 5]
+
+
+def test_selector_cost():
+    assert Selector("is_code").cost == LOW_COST
+    assert Selector("contains", "a").cost == DEFAULT_COST
+    assert Selector("contains", "a", output=True).cost == HIGH_COST
+    assert Selector("contains", "a", True, True).cost == HIGH_COST
+    assert Selector(["is_code", "has_byte_size"]).cost == LOW_COST + HIGH_COST
+
+
+def test_selector_cheapest_first(nb1: Notebook):
+    visited = []
+
+    def visit(cell):
+        visited.append(cell.num)
+        return True
+
+    expected = nb1.select("is_code").list()
+    assert nb1.select([visit, "is_code"]).list() == expected
+    assert visited == expected
+
+    visited.clear()
+    DefaultSelector.register_selector("visit", visit, cost=0)
+    try:
+        expected = nb1.select("has_byte_size", 20).list()
+        assert (
+            nb1.select(Selector("has_byte_size", 20) & Selector("visit")).list()
+            == expected
+        )
+    finally:
+        DefaultSelector.default_selectors.pop("visit")
+        DefaultSelector.default_costs.pop("visit")
+    assert visited == list(range(len(nb1)))
+
+
+@pytest.mark.parametrize(
+    "selector, expected",
+    [
+        (Selector(-1), [14]),
+        (Selector(42), []),
+        (Selector(slice(-3, None)), [12, 13, 14]),
+        (Selector(slice(None, None, -5)), [4, 9, 14]),
+        (Selector(slice(2, 6)) & Selector(slice(4, None)), [4, 5]),
+        (Selector(1) | Selector(slice(13, None)), [1, 13, 14]),
+        (Selector(slice(2, 8)) & Selector("is_code"), [3, 5, 7]),
+        (~Selector(slice(1, None)), [0]),
+    ],
+)
+def test_selector_candidates(nb6: Notebook, selector, expected):
+    assert nb6.select(selector).list() == expected
+
+
+def test_selector_plan(nb6: Notebook):
+    candidates, predicate = (Selector(slice(2, 6)) & Selector(-2))._plan(
+        nb6.raw_nb, False
+    )
+    assert list(candidates) == []
+    assert predicate is None
+
+    candidates, predicate = (Selector(slice(0, 8)) & Selector("is_code"))._plan(
+        nb6.raw_nb, False
+    )
+    assert list(candidates) == [1, 3, 5, 7]
+    assert predicate is None
+
+    candidates, predicate = (
+        Selector(slice(0, 8)) & Selector("has_byte_size", 20)
+    )._plan(nb6.raw_nb, False)
+    assert list(candidates) == list(range(8))
+    assert predicate is not None
+
+
+def test_materialize(nb6: Notebook):
+    code = nb6.select("is_code").materialize()
+    tagged = nb6.select("contains", "a").materialize()
+    assert isinstance(code._selector, MaskSelector)
+
+    assert code.list() == nb6.select("is_code").list()
+    assert code.count() == len(code.list())
+    assert (code & tagged).list() == (nb6.select("is_code") & tagged).list()
+    assert (code | ~tagged).list() == (
+        nb6.select("is_code") | ~nb6.select("contains", "a")
+    ).list()
+    assert isinstance((code & ~tagged)._selector, MaskSelector)
+    assert (~code).count() == len(nb6.cells) - code.count()
+    assert code.select(slice(5)).list() == [1, 3]
+
+
+def test_materialize_modified(nb1_0: Notebook):
+    code = nb1_0.select("is_code").materialize()
+    assert code.list() == [1, 2, 3]
+
+    nb1_0[0].delete()
+    assert code.list() == [0, 1, 2]
+    assert code.count() == 3
+
+
+def test_materialize_direct_edits(nb1_0: Notebook):
+    markdown = nb1_0.select("is_markdown").materialize()
+    code = nb1_0.select("is_code").materialize()
+    assert markdown.list() == [0]
+
+    # edits made without the Notebook API
+    nb1_0.cells[0]["cell_type"] = "code"
+    assert markdown.list() == []
+    assert code.list() == [0, 1, 2, 3]
+    assert (markdown | code).list() == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize(
+    "key, args, kwargs",
+    [
+        ("is_code", (), {}),
+        ("markdown_cells", (), {}),
+        ("has_type", ("raw",), {}),
+        ("contains", ("a",), {}),
+        ("contains", ("A",), {"case": False}),
+        ("contains", ("^[a-z]",), {"regex": True}),
+        ("contains", ("125",), {"output": True}),
+        ("contains", ("125",), {"output": "raw"}),
+        ("has_output", (), {}),
+        ("has_output", (False,), {}),
+        ("is_empty", (), {}),
+        ("has_tag", ("Train",), {}),
+        ("has_tag", ("train",), {"case": True}),
+        ("has_output_type", ("text/plain",), {}),
+        ("has_output_type", (["image"],), {}),
+        ("has_slide_type", ({"slide", "subslide"},), {}),
+        ("is_new_slide", (), {"subslide": False}),
+    ],
+)
+def test_batch_selectors(nb6: Notebook, key: str, args: tuple, kwargs: dict):
+    from nbmanips.cell import Cell
+
+    nb6 = nb6.copy()
+    nb6.select([1, 5], type="or").add_tag("Train")
+    nb6[2].add_tag("train")
+    nb6.select([0, 7], type="or").set_slide()
+    nb6[3].set_subslide()
+
+    assert key in DefaultSelector.default_batches
+    func = DefaultSelector.default_selectors[key]
+    expected = [
+        i for i, cell in enumerate(nb6.cells) if func(Cell(cell, i), *args, **kwargs)
+    ]
+    assert nb6.select(key, *args, **kwargs).list() == expected
+    assert nb6.select(~Selector(key, *args, **kwargs)).list() == [
+        i for i in range(len(nb6.cells)) if i not in expected
+    ]
+
+
+class FailingParser(ParserBase):
+    def parse(self, content, **kwargs):
+        raise AssertionError("outputs should not be rendered")
+
+
+@pytest.mark.parametrize("nb_name", ["nb1", "nb3", "nb6"])
+def test_structural_output(request, monkeypatch, nb_name: str):
+    from nbmanips.cell import CellOutput
+
+    nb = request.getfixturevalue(nb_name)
+    has_output = [cell.num for cell in nb if cell.output != ""]
+    is_empty = [cell.num for cell in nb if cell.source == "" and cell.output == ""]
+
+    for key in ("text", "text/html", "image"):
+        monkeypatch.setitem(CellOutput._parsers, key, FailingParser())
+
+    assert nb.select("has_output").list() == has_output
+    assert nb.select("has_output", False).list() == [
+        i for i in range(len(nb.cells)) if i not in has_output
+    ]
+    assert nb.select("is_empty").list() == is_empty
+    assert [cell.num for cell in nb if cell.has_output()] == has_output
+
+
+def test_contains_raw_output(nb1: Notebook, nb3: Notebook):
+    assert nb1.select("contains", "125", output="raw").list() == [3]
+    assert nb1.select("contains", "hello", case=False, output="raw").list() == [1]
+    assert nb3.select("contains", "Figure", output="raw").list() == [3, 4]
+    assert nb3.select("contains", "iVBOR", output="raw").list() == []
+
+
+def test_explain(nb6: Notebook):
+    def long_cell(cell):
+        return len(cell.source) > 10
+
+    selection = nb6.select(slice(2, None)).select(long_cell).select("is_code")
+    explanation = selection.explain()
+
+    labels = [node.label for node in explanation.nodes]
+    assert labels == ["and", "[2:]", "long_cell", "is_code()"]
+    assert explanation.selected == selection.count()
+
+    _, sliced, long_node, code = explanation.nodes
+    assert (sliced.calls, sliced.cells_out) == (1, len(nb6.cells) - 2)
+    assert long_node.calls == long_node.cells_in == explanation.allocations
+    assert long_node.cells_out == explanation.selected
+    assert "total:" in str(explanation)
+
+
+def _long_cell(cell):
+    return len(cell.source) > 10
+
+
+@pytest.mark.parametrize(
+    "selector, pickled",
+    [
+        (Selector(None), False),
+        (Selector(-2), False),
+        (~Selector(slice(1, None, 2)), False),
+        (Selector("contains", "A", case=False, output="raw"), False),
+        (Selector("has_match", re.compile("^a", re.IGNORECASE)), False),
+        (Selector("has_output_type", {"image/png", "text/plain"}), False),
+        (
+            Selector(["is_code", "has_output"], type="or") & ~Selector("contains", "="),
+            False,
+        ),
+        (~ContextSelector(Selector("is_markdown"), 1, 0), False),
+        (Selector(_long_cell) | ~Selector("is_markdown"), True),
+    ],
+)
+def test_serialization(nb6: Notebook, selector, pickled: bool):
+    from nbmanips.selector.serialization import from_json, to_dict, to_json
+
+    content = to_json(selector)
+    assert to_json(from_json(content)) == content
+    assert nb6.select(from_json(content)).list() == nb6.select(selector).list()
+    assert json.loads(content) == to_dict(selector)
+    assert ('"pickle"' in content) is pickled
+
+
+def test_serialization_materialized(nb6: Notebook):
+    from nbmanips.selector.serialization import from_json, to_json
+
+    selection = nb6.select("is_code").materialize()
+    assert json.loads(to_json(selection._selector))["type"] == "default"
+    assert json.loads(to_json((~selection)._selector))["neg"] is True
+    assert (
+        nb6.select(from_json(to_json((~selection)._selector))).list()
+        == (~selection).list()
+    )
+
+
+@pytest.mark.parametrize(
+    "expression, selector",
+    [
+        ("is_code", Selector("is_code")),
+        (
+            "is_code & (contains('a') | contains('B', case=False)) & ~is_empty",
+            Selector("is_code")
+            & (Selector("contains", "a") | Selector("contains", "B", case=False))
+            & ~Selector("is_empty"),
+        ),
+        (
+            "is_markdown or not has_output and 3",
+            Selector("is_markdown") | ~Selector("has_output") & Selector(3),
+        ),
+        ("slice(2, 8) & ~-1", Selector(slice(2, 8)) & ~Selector(-1)),
+    ],
+)
+def test_query(nb6: Notebook, expression: str, selector):
+    assert nb6.query(expression).list() == nb6.select(selector).list()
+
+
+@pytest.mark.parametrize(
+    "expression", ["is_code &", "unknown_selector", "contains(x)", "'text'"]
+)
+def test_query_errors(expression: str):
+    from nbmanips.selector.query import parse_query
+
+    with pytest.raises(ValueError, match="(?i)selector"):
+        parse_query(expression)
+
+
+def test_context_selector(nb6: Notebook):
+    markdown_cells = nb6.select("is_markdown")
+    assert markdown_cells.list() == [0, 2, 4, 6, 8, 12]
+
+    assert markdown_cells.with_context(after=1).list() == [*range(10), 12, 13]
+    assert markdown_cells.with_context(before=2).list() == [*range(9), 10, 11, 12]
+    assert (~markdown_cells.with_context(1, 1)).list() == [10, 14]
+
+    selection = nb6.select([0, 14], type="or").with_context(2, 2)
+    assert selection.list() == [0, 1, 2, 12, 13, 14]
+
+    selection = markdown_cells.with_context(0, 1).select("is_code")
+    assert selection.list() == [1, 3, 5, 7, 9, 13]
+
+
+@pytest.mark.parametrize(
+    "args, kwargs, expected",
+    [
+        (["part 1"], {}, [*range(8)]),
+        (["1-Subpart"], {"level": 3}, []),
+        (["Subpart"], {"regex": True}, [2, 3, 4, 5, 6, 7]),
+        ([re.compile("^Part 3")], {"level": 2}, [12, 13, 14]),
+    ],
+)
+def test_in_section(nb6: Notebook, args, kwargs, expected):
+    assert nb6.select("in_section", *args, **kwargs).list() == expected
+
+
+@pytest.mark.parametrize(
+    "key, name, expected",
+    [
+        ("has_identifier", "pd", [0, 1]),
+        ("has_identifier", "col1", []),  # strings are ignored
+        ("calls", "plot", [3, 4]),
+        ("calls", "plt.show", [3]),
+        ("imports", "matplotlib", [0]),
+        ("imports", "matplotlib.pyplot", [0]),
+        ("defines", "df", [1]),
+    ],
+)
+def test_symbol_selectors(nb3: Notebook, key: str, name: str, expected: list):
+    selector_function = DefaultSelector.default_selectors[key]
+    assert nb3.select(key, name).list() == expected
+    assert [
+        cell.num for cell in nb3.iter_cells() if selector_function(cell, name)
+    ] == expected
+
+
+def test_get_symbols():
+    from nbmanips.cell.symbols import get_symbols
+
+    symbols = get_symbols(
+        "%matplotlib inline\n"
+        "from sklearn.svm import SVC\n"
+        "files = !ls\n"
+        "def train(model):  # fit the model\n"
+        "    %time model.fit(X)\n"
+        "    return model.predict(X)\n"
+    )
+    assert {"SVC", "train", "model", "predict"} <= symbols.identifiers
+    assert "fit" not in symbols.identifiers
+    assert symbols.calls == {"predict", "model.predict"}
+    assert symbols.imports == {"sklearn", "sklearn.svm", "sklearn.svm.SVC"}
+    assert symbols.defines == {"train"}
+
+    assert get_symbols("%%bash\nls").identifiers == set()
+
+    # `%` and `!` only start magics on new statements
+    symbols = get_symbols(
+        "import os\n"
+        'msg = ("cwd: %s"\n'
+        "       % os.getcwd())\n"
+        "ok = (msg\n"
+        "      != 1)\n"
+        'doc = """\n'
+        "%not a magic\n"
+        '"""\n'
+        "!echo (\n"
+        "print(msg)\n"
+    )
+    assert symbols.imports == {"os"}
+    assert symbols.calls == {"getcwd", "os.getcwd", "print"}
+    assert symbols.defines == {"msg", "ok", "doc"}
+    assert get_symbols("def f(:\n    fit").identifiers == {"f", "fit"}
+
+
+def test_in_section_ranges(nb6: Notebook):
+    selector = Selector("in_section", "Part", regex=True, level=1)
+    assert selector._plan(nb6.raw_nb, False) == (range(15), None)
+
+    selector = Selector("in_section", "subpart", regex=True)
+    assert selector._plan(nb6.raw_nb, False) == (range(2, 8), None)
+    assert selector._plan(nb6.raw_nb, True) == ([0, 1, *range(8, 15)], None)
+    assert nb6.select(~selector).list() == [0, 1, *range(8, 15)]
+
+    # evaluated as a predicate, e.g. in a union with a non-exact selector
+    predicate = selector | Selector(lambda cell: cell.num == 12)
+    assert nb6.select(predicate).list() == [*range(2, 8), 12]
+
+
+def test_lazy_output_selectors(monkeypatch):
+    from nbmanips.cell import Cell
+
+    cells = [
+        {
+            "cell_type": "code",
+            "execution_count": i,
+            "metadata": {},
+            "source": f"print({i})",
+            "outputs": [{"output_type": "stream", "name": "stdout", "text": f"x{i}\n"}],
+        }
+        for i in range(1000)
+    ]
+    content = {"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 4}
+
+    rendered = []
+    get_output = Cell.get_output
+
+    def counted_get_output(cell, *args, **kwargs):
+        rendered.append(cell.num)
+        return get_output(cell, *args, **kwargs)
+
+    monkeypatch.setattr(Cell, "get_output", counted_get_output)
+
+    def count_renders(method):
+        rendered.clear()
+        # a new notebook each time, so that the rendered texts are not cached
+        method(Notebook(content, validate=False, copy=True))
+        return len(rendered)
+
+    assert count_renders(lambda nb: nb.search("x1", output=True)) == 2
+    assert (
+        count_renders(lambda nb: nb.select("contains", "x0", output=True).first()) == 1
+    )
+    assert count_renders(lambda nb: nb.select("contains", "x", output=True).last()) == 1
+    assert (
+        count_renders(lambda nb: nb[5].select("contains", "x5", output=True).list())
+        == 1
+    )
+    assert (
+        count_renders(
+            lambda nb: nb.select("is_markdown")
+            .select("contains", "x", output=True)
+            .list()
+        )
+        == 0
+    )
+
+
+def test_in_section_direct_edits(test_files):
+    def read():
+        nb = Notebook.read(str(test_files / "nb6.ipynb"))
+        assert nb.select("in_section", "Part 1").list() == list(range(8))
+        return nb
+
+    # edits made without the Notebook API
+    nb = read()
+    del nb.cells[3:]
+    assert nb.select("in_section", "Part 1").list() == [0, 1, 2]
+
+    nb = read()
+    del nb.cells[2:6]
+    assert nb.select("in_section", "Part 1").list() == [0, 1, 2, 3]
+    assert nb.select("in_section", "Part 2:").list() == [4, 5, 6, 7]
+
+    nb = read()
+    nb.cells[0]["source"] = "# Introduction"
+    assert nb.select("in_section", "Part 1").list() == []
+    assert nb.select("in_section", "Introduction").list() == list(range(8))